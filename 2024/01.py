@@ -1,23 +1,62 @@
 import numpy as np
 import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import load_int_columns
 
 def part1(filename: str):
     # Implementation for part 1
-    with open(filename, 'r') as file:
-        data = np.array([line.strip().split() for line in file.readlines()]).astype(int)
-        left = np.sort(data[:, 0])
-        right = np.sort(data[:, 1])        
+    data = load_int_columns(filename)
+    left = np.sort(data[:, 0])
+    right = np.sort(data[:, 1])
+
+    return np.sum(np.abs(right - left))
+
+def similarity_score(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Sum of every left value multiplied by the number of its occurrences in the right list.
+    The right list is reduced to a sorted histogram once, afterwards all left values are looked up at once -> O(n log n)
+    
+    :param left: values of the left list
+    :param right: values of the right list
+    :return: similarity score
+    """
+    if len(left) == 0 or len(right) == 0:
+        return 0
+    values, counts = np.unique(right, return_counts=True)
+
+    # Find the histogram bin of every left value. Values that are not part of the right list get a count of zero.
+    idx = np.minimum(np.searchsorted(values, left), len(values) - 1)
+    occurrences = np.where(values[idx] == left, counts[idx], 0)
+    return int(np.dot(left.astype(np.int64), occurrences))
 
-        return np.sum(np.abs(right - left))
 
 def part2(filename: str):
     # Implementation for part 2
-    with open(filename, 'r') as file:
-        data = np.array([line.strip().split() for line in file.readlines()]).astype(int)
-        occurrences = np.array([len(np.where(data[:,1] == v)[0]) for v in data[:, 0]])
-        return np.dot(data[:, 0], occurrences)
-    
+    data = load_int_columns(filename)
+    return similarity_score(data[:, 0], data[:, 1])
+
+
+def similarity_scaling_benchmark(max_rows: int = 10**7, repeat: int = 3):
+    # Time the similarity score on random lists of increasing size to verify the O(n log n) scaling.
+    rng = np.random.default_rng(0)
+    rows = 10**3
+    while rows <= max_rows:
+        data = rng.integers(10000, 100000, size=(rows, 2))
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            similarity_score(data[:, 0], data[:, 1])
+            timings.append(time.perf_counter() - start_time)
+        print(f"Similarity score: {rows:>10} rows -> t = {min(timings):.4f} seconds.")
+        rows *= 10
+
+
 if __name__ == "__main__":
+    assert similarity_score(np.array([3, 4, 2, 1, 3, 3]), np.array([4, 3, 5, 3, 9, 3])) == 31
+
     start_time = time.time()
     print(f"Part 1: {part1('./2024/01_test.txt')} -> t = {time.time() - start_time} seconds.")
     start_time = time.time()
@@ -25,4 +64,8 @@ if __name__ == "__main__":
     start_time = time.time()
     print(f"Part 2: {part2('./2024/01_test.txt')} -> t = {time.time() - start_time} seconds.")
     start_time = time.time()
-    print(f"Part 2: {part2('./2024/01_input.txt')} -> t = {time.time() - start_time} seconds.")
\ No newline at end of file
+    print(f"Part 2: {part2('./2024/01_input.txt')} -> t = {time.time() - start_time} seconds.")
+
+    # The scaling benchmark runs on up to 10^7 random rows, hence it is only started on request: python 2024/01.py --scaling
+    if '--scaling' in sys.argv[1:]:
+        similarity_scaling_benchmark()
\ No newline at end of file
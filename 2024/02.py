@@ -1,5 +1,10 @@
 import numpy as np
 import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import load_int_rows
 
 
 def test_line(line: str) -> bool:
@@ -44,19 +49,76 @@ def test_line_dampened(line: str) -> bool:
     return test_line(new_line)
 
 
+def test_reports(reports: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Batch version of test_line for all reports at once.
+    
+    :param reports: padded reports, one per row -> shape (num_reports, max_length)
+    :param lengths: number of valid entries per report
+    :return: boolean array, True for every safe report
+    """
+    steps, valid = _report_steps(reports, lengths)
+    increasing = (steps >= 1) & (steps <= 3) | ~valid
+    decreasing = (steps <= -1) & (steps >= -3) | ~valid
+    return (np.all(increasing, axis=1) | np.all(decreasing, axis=1)) & (lengths > 0)
+
+
+def test_reports_dampened(reports: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Batch version of test_line_dampened. Every report is tested for all possible single removals at once.
+    
+    Removing entry k drops the steps k-1 and k and bridges them with the step reports[k+1] - reports[k-1].
+    Hence, a removal is valid if all steps before k-1 and after k are valid and the bridging step is valid as well.
+    Prefix and suffix validity of the steps are precomputed with cumulative ANDs, so every removal is checked in O(1).
+    
+    :param reports: padded reports, one per row -> shape (num_reports, max_length)
+    :param lengths: number of valid entries per report
+    :return: boolean array, True for every report that is safe with at most one removal
+    """
+    num_reports, width = reports.shape
+    if width < 2:
+        return lengths > 0
+    steps, valid = _report_steps(reports, lengths)
+    removal = np.arange(width)
+
+    # Bridging step over each removed entry. Removing the first or last entry does not create a new step.
+    bridge = np.zeros((num_reports, width), dtype=reports.dtype)
+    bridge[:, 1:-1] = reports[:, 2:] - reports[:, :-2]
+    bridged = (removal > 0) & (removal < lengths[:, None] - 1)
+
+    result = np.zeros(num_reports, dtype=bool)
+    for sign in (1, -1):
+        step_ok = (sign * steps >= 1) & (sign * steps <= 3) | ~valid
+        bridge_ok = (sign * bridge >= 1) & (sign * bridge <= 3) | ~bridged
+
+        # prefix[:, i] -> all steps before i are valid; suffix[:, i] -> all steps from i onwards are valid
+        all_true = np.ones((num_reports, 1), dtype=bool)
+        prefix = np.hstack([all_true, np.logical_and.accumulate(step_ok, axis=1)])
+        suffix = np.hstack([np.logical_and.accumulate(step_ok[:, ::-1], axis=1)[:, ::-1], all_true, all_true])
+
+        # Removing entry k keeps the steps 0..k-2 and k+1..
+        before = prefix[:, np.maximum(removal - 1, 0)]
+        after = suffix[:, removal + 1]
+        result |= np.any(before & after & bridge_ok & (removal < lengths[:, None]), axis=1)
+    return result | test_reports(reports, lengths)
+
+
+def _report_steps(reports: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Steps between neighboring entries and a mask of the steps that lie within each report
+    steps = reports[:, 1:] - reports[:, :-1]
+    valid = np.arange(steps.shape[1]) < lengths[:, None] - 1
+    return steps, valid
+
+
 def part1(filename: str):
     # Task 1: Find the number ofvalid lines in the file without any deletion.
-    with open(filename, 'r') as file:
-        data = file.readlines()
-        res = [test_line(line) for line in data]
-    return np.sum(res)
+    reports, lengths = load_int_rows(filename, signed=True)
+    return np.sum(test_reports(reports, lengths))
 
 def part2(filename: str):
     # Task 2: Find the number of valid lines in the file with at most one deletion.
-    with open(filename, 'r') as file:
-        data = file.readlines()
-        res = [test_line_dampened(line) for line in data]
-    return np.sum(res)
+    reports, lengths = load_int_rows(filename, signed=True)
+    return np.sum(test_reports_dampened(reports, lengths))
 
 if __name__ == "__main__":
 
@@ -1,6 +1,7 @@
 import numpy as np
 import time
 import re
+import mmap
 
 
 def find_all_matches(string: str):
@@ -43,9 +44,62 @@ def part2(filename: str):
     return result
 
 
+# Streaming variant for dumps that do not fit into memory, with the same tokens as part1 / part2: mul(X,Y), don't and do.
+# The numbers of mul(X,Y) may have any length, hence the overlap between two chunks is not bounded by a token length.
+# Instead the chunk is cut in front of a token that might continue in the next chunk. Such a token starts with the last "m"
+# or "d" of the chunk, as no token contains one of these letters apart from its first character.
+stream_tokens = re.compile(rb"mul\((\d*),(\d*)\)|don't|do")
+partial_token = re.compile(rb"m(?:u(?:l(?:\(\d*(?:,\d*)?)?)?)?|d(?:o(?:n'?)?)?")
+
+
+def scan_memory(filename: str, use_conditionals: bool = False, chunk_size: int = 1 << 20) -> int:
+    """
+    Sum all multiplications of the file by scanning a memory map chunk by chunk. Peak memory is bounded by the chunk size
+    (plus the length of a single token).
+    
+    A token at the end of a chunk might be cut off (e.g. "mul(12" or "do" of "don't"). Its bytes are carried over
+    and rescanned together with the next chunk, hence it is only counted there.
+    
+    :param filename: name of the input file
+    :param use_conditionals: if True, do and don't enable / disable the following multiplications (Task 2)
+    :param chunk_size: number of bytes read from the memory map per step
+    :return: sum of all (enabled) products
+    """
+    result = 0
+    active = True
+    with open(filename, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return 0
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            carry = b''
+            for offset in range(0, len(memory), chunk_size):
+                buffer = carry + memory[offset:offset + chunk_size]
+                boundary = len(buffer)
+                if offset + chunk_size < len(memory):
+                    last = max(buffer.rfind(b'm'), buffer.rfind(b'd'))
+                    if last >= 0 and partial_token.fullmatch(buffer, last):
+                        boundary = last
+
+                for match in stream_tokens.finditer(buffer, 0, boundary):
+                    token = match.group()
+                    if token == b"don't":
+                        active = False
+                    elif token == b"do":
+                        active = True
+                    elif active or not use_conditionals:
+                        result += int(match.group(1)) * int(match.group(2))
+                carry = buffer[boundary:]
+    return result
+
+
 if __name__ == "__main__":
     assert part1('./2024/03_test.txt') == 161
     assert part2('./2024/03_test.txt') == 48
+    assert scan_memory('./2024/03_test.txt', False, chunk_size=5) == 161
+    assert scan_memory('./2024/03_test.txt', True, chunk_size=5) == 48
+    assert scan_memory('./2024/03_input.txt', False) == part1('./2024/03_input.txt')
+    assert scan_memory('./2024/03_input.txt', True) == part2('./2024/03_input.txt')
+    assert scan_memory('./2024/03_input.txt', True, chunk_size=7) == part2('./2024/03_input.txt')
 
     start_time = time.time()
     print(f"Part 1: {part1('./2024/03_test.txt')} -> t = {time.time() - start_time} seconds.")
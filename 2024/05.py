@@ -1,113 +1,103 @@
 import numpy as np
 import time
-import re
+import sys
+from pathlib import Path
 
-def is_conform_to_norm(sequence: str, norm) -> bool:
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import parse_int_rows, parse_ints
+
+
+def load_norms_and_sequences(filename: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Test if the sequence conforms to the given norm. The sequence conforms to the norm if the specified numbers are in the same order as in the norm.
+    Load the norms (a|b -> a has to be printed before b) and the sequences of the file.
     
-    :param sequence: input sequence to test
-    :param norm: array containing the two numbers to check the sequence against
-    :return: True / False
+    :param filename: name of the input file
+    :return: norms as array of shape (num_norms, 2), padded sequences and the length of each sequence
     """
-    key = F".*{norm[1]}.*{norm[0]}.*"
-    if re.match(key, sequence):
-        return False
-    return True
+    with open(filename, 'rb') as file:
+        data = file.read().replace(b'\r', b'')
+    cutoff = data.find(b'\n\n')
+    norms = parse_ints(data[:cutoff]).reshape(-1, 2)
+    sequences, lengths = parse_int_rows(data[cutoff + 2:].strip(), fill=-1)
+    return norms, sequences, lengths
 
 
-def is_conform_to_norms(sequence: str, key) -> bool:
+def build_norm_index(norms: np.ndarray, num_pages: int) -> np.ndarray:
     """
-    Check whether the sequence conforms to all the norms defined by the regex key.
+    Build a dense lookup table of all norms: index[a, b] is True if page a has to be printed before page b.
     
-    :param sequence: input sequence to test
-    :param key: regex pattern to check the sequence against
-    :return: True / False
-    """    
-    if re.match(key, sequence):
-        return False
-    return True
+    :param norms: array of shape (num_norms, 2) containing the page pairs (a, b)
+    :param num_pages: number of page numbers, all pages have to be smaller
+    :return: boolean matrix of shape (num_pages, num_pages)
+    """
+    index = np.zeros((num_pages, num_pages), dtype=bool)
+    index[norms[:, 0], norms[:, 1]] = True
+    return index
 
 
-def part1(filename: str):
-    # Implementation for part 1
-    with open(filename, 'r') as file:
-        data = np.array([line.strip() for line in file.readlines()])
-        cutoff = np.where(data == '')[0][0]
-        norms = [list(map(int, line.split('|'))) for line in data[:cutoff]]
-        sequences = data[cutoff+1:]
-        sequences_split = []
-
-        #  Build regex key for all norms to test all at once
-        key = F".*{norms[0][1]}.*{norms[0][0]}.*"
-        for i in norms:
-            key += F"|.*{i[1]}.*{i[0]}.*"
-
-        # Test all sequences and keep only those that conform to all norms
-        for seq in sequences:
-            if not is_conform_to_norms(seq, key):
-                continue
-
-            sequences_split.append(seq.split(','))
-        
-        # Return the sum of the middle elements of all conforming sequences
-        results = [int(a[(len(a))//2]) for a in sequences_split]
-    return sum(results)
-
-
-def make_conform(seq: str, norms) -> str:
+def is_conform_to_norms(sequences: np.ndarray, index: np.ndarray) -> np.ndarray:
     """
-    Update the sequence to conform to the given norms by swapping elements until all norms are met.
+    Check for all sequences at once whether they conform to all norms.
+    
+    A sequence is violated if a later page has to be printed before an earlier one: index[seq[j], seq[i]] for j > i.
+    The pairs are looked up one offset j - i at a time, hence the work and memory grow with the total length of the sequences
+    (times the length of the longest one), independent of the number of norms.
+    
+    :param sequences: padded sequences, one per row (padding -1)
+    :param index: norm index, see build_norm_index
+    :return: boolean array, True for every conforming sequence
+    """
+    # The padding is mapped to an additional page without any norm
+    index = np.pad(index, ((0, 1), (0, 1)))
+    sequences = np.where(sequences < 0, len(index) - 1, sequences)
+
+    conform = np.ones(len(sequences), dtype=bool)
+    for offset in range(1, sequences.shape[1]):
+        conform &= ~np.any(index[sequences[:, offset:], sequences[:, :-offset]], axis=1)
+    return conform
+
+
+def make_conform(seq: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    Update the sequence to conform to the given norms.
+    Each page is ranked by the number of pages in the sequence that have to be printed before it, sorting by this rank fixes the order.
     
     :param seq: Input sequence to be modified
-    :param norms: List of norms to apply
+    :param index: norm index, see build_norm_index
     :return: Modified sequence 
     """
-    # Iteratively fix the sequence until all norms are matched
-    i = 0
-        
-    while i < len(norms):
-        n = norms[i]
-        a = seq.find(F"{n[0]}")
-        b = seq.find(F"{n[1]}")
-        if b == -1 or a == -1:
-            i += 1
-            continue
-        if b < a:
-            seq = seq[:b] + F"{n[0]}," + seq[b:a] + seq[a+len(F"{n[0]},"):]
-            i = 0
-        else:
-            i += 1
-    
-    if  seq [-1] == ',':
-        seq = seq[:-1]
-    return seq 
+    predecessors = np.sum(index[np.ix_(seq, seq)], axis=0)
+    return seq[np.argsort(predecessors, kind='stable')]
+
+
+def part1(filename: str):
+    # Implementation for part 1
+    norms, sequences, lengths = load_norms_and_sequences(filename)
+    num_pages = max(norms.max(), sequences.max()) + 1
+    index = build_norm_index(norms, num_pages)
+
+    # Test all sequences and keep only those that conform to all norms
+    conform = is_conform_to_norms(sequences, index)
+
+    # Return the sum of the middle elements of all conforming sequences
+    results = sequences[conform, lengths[conform] // 2]
+    return int(np.sum(results))
 
 
 def part2(filename: str):
     # Implementation for part 2
-    with open(filename, 'r') as file:
-        data = np.array([line.strip() for line in file.readlines()])
-        cutoff = np.where(data == '')[0][0]
-        norms = [list(map(int, line.split('|'))) for line in data[:cutoff]]
-        sequences = data[cutoff+1:]
-        failed_sequences = []
-        
-        # Build regex key for all norms to test all at once
-        key = F".*{norms[0][1]}.*{norms[0][0]}.*"
-        for i in norms:
-            key += F"|.*{i[1]}.*{i[0]}.*"
-
-        # Test all sequences and modify those that do not conform to all norms.
-        # Only store the modified sequences.
-        for seq in sequences:
-            if not is_conform_to_norms(seq, key):
-                seq = make_conform(seq, norms) 
-                failed_sequences.append(seq.split(','))
-        
-        # Return the sum of the middle elements of all modified sequences
-        results = [int(a[(len(a))//2]) for a in failed_sequences]
-    return sum(results)          
+    norms, sequences, lengths = load_norms_and_sequences(filename)
+    num_pages = max(norms.max(), sequences.max()) + 1
+    index = build_norm_index(norms, num_pages)
+
+    # Test all sequences and modify those that do not conform to all norms.
+    # Only store the modified sequences.
+    conform = is_conform_to_norms(sequences, index)
+    failed_sequences = [make_conform(seq[:length], index) for seq, length in zip(sequences[~conform], lengths[~conform])]
+
+    # Return the sum of the middle elements of all modified sequences
+    results = [seq[len(seq) // 2] for seq in failed_sequences]
+    return int(np.sum(results))
     
 
 if __name__ == "__main__":
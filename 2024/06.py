@@ -1,62 +1,199 @@
 import numpy as np
 import time
+from bisect import bisect_left
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import load_char_grid
+
+# Directions in turning order (always turn right): up, right, down, left
+directions = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+def build_jump_tables(data: np.ndarray) -> np.ndarray:
+    """
+    Precompute the next obstacle for every cell and direction.
+    
+    :param data: character codes of the map, see load_char_grid
+    :return: int32 array of shape (4, rows, cols). For up / down it holds the row, for right / left the column of the next obstacle. -1 if there is none.
+    """
+    num_rows, num_cols = data.shape
+    blocked = data == ord('#')
+    tables = np.full((4, num_rows, num_cols), -1, dtype=np.int32)
+    row_idcs = np.arange(num_rows, dtype=np.int32)[:, None]
+    col_idcs = np.arange(num_cols, dtype=np.int32)[None, :]
+
+    # Running maximum / minimum of the obstacle indices gives the closest obstacle at or before each cell.
+    # Shifting by one cell excludes the cell itself.
+    tables[0, 1:] = np.maximum.accumulate(np.where(blocked, row_idcs, -1), axis=0)[:-1]
+    tables[1, :, :-1] = np.minimum.accumulate(np.where(blocked, col_idcs, num_cols)[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    tables[2, :-1] = np.minimum.accumulate(np.where(blocked, row_idcs, num_rows)[::-1], axis=0)[::-1][1:]
+    tables[3, :, 1:] = np.maximum.accumulate(np.where(blocked, col_idcs, -1), axis=1)[:, :-1]
+    tables[1][tables[1] == num_cols] = -1
+    tables[2][tables[2] == num_rows] = -1
+    return tables
+
 
 def part1(filename: str):
-    with open(filename, 'r') as file:
-        data = np.array([line.strip() for line in file.readlines()])
-        data = np.array(np.frombuffer(data, dtype='S4'), dtype=str).reshape(len(data[0]), -1)
-        pos = np.where(data == '^')
-        pos  = np.array((pos[0][0], pos[1][0]))
-        dir = 'up'
-        obstacles_rows = np.where(data == '#')
-        sorted_indices = np.argsort(obstacles_rows[1])
-        obstacles_cols = [obstacles_rows[i][sorted_indices] for i in range(len(obstacles_rows))]
-        obs_per_col = [np.array([obstacles_cols[0][obstacles_cols[1] == i]]) for i in range(data.shape[1])]
-        obs_per_row = [np.array([obstacles_rows[1][obstacles_rows[0] == i]]) for i in range(data.shape[0])]
-        while True:
-            # dir = 'up'
-            obs = obs_per_col[pos[1]][obs_per_col[pos[1]] < pos[0]]
-            if len(obs) == 0:
-                data[0: pos[0] + 1, pos[1]] = 'X'
-                break
-            else:
-                data[obs[-1] + 1:pos[0] + 1, pos[1]] = 'X'
-                pos[0] = obs[-1] + 1
-            # dir = 'right'
-            obs = obs_per_row[pos[0]][obs_per_row[pos[0]] > pos[1]]
-            if len(obs) == 0:
-                data[pos[0], pos[1]:] = 'X'
-                break
-            else:
-                data[pos[0], pos[1]: obs[0]] = 'X'
-                pos[1] = obs[0] - 1
-            # dir = 'down'
-            obs = obs_per_col[pos[1]][obs_per_col[pos[1]] > pos[0]]
-            if len(obs) == 0:
-                data[pos[0]:, pos[1]] = 'X'
-                break
-            else:
-                data[pos[0]: obs[0], pos[1]] = 'X'
-                pos[0] = obs[0] - 1
-        # dir = 'left'
-            obs = obs_per_row[pos[0]][obs_per_row[pos[0]] < pos[1]]
-            if len(obs) == 0:
-                data[pos[0], 0: pos[1] + 1] = 'X'
-                break
-            else:
-                data[pos[0], obs[-1] + 1: pos[1] + 1] = 'X'
-                pos[1] = obs[-1] + 1
-    return np.sum(data == 'X')
+    # Count all cells visited by the guard before leaving the map.
+    # The guard jumps from obstacle to obstacle using the precomputed tables, the cells in between are marked in a mask.
+    data = load_char_grid(filename)
+    tables = build_jump_tables(data)
+    visited = np.zeros(data.shape, dtype=np.uint8)
+    start = np.argwhere(data == ord('^'))[0]
+    r, c, dir = int(start[0]), int(start[1]), 0
+    turns = set()
+    while True:
+        stop = int(tables[dir, r, c])
+        if dir == 0:  # up
+            visited[stop + 1:r + 1, c] = 1
+            r = stop + 1
+        elif dir == 1:  # right
+            visited[r, c:stop if stop >= 0 else None] = 1
+            c = stop - 1
+        elif dir == 2:  # down
+            visited[r:stop if stop >= 0 else None, c] = 1
+            r = stop - 1
+        else:  # left
+            visited[r, stop + 1:c + 1] = 1
+            c = stop + 1
+        if stop < 0:
+            break  # the guard left the map
+
+        dir = (dir + 1) % 4
+        if (r, c, dir) in turns:
+            raise ValueError("The guard is trapped in a loop and never leaves the map.")
+        turns.add((r, c, dir))
+    return int(np.count_nonzero(visited))
+
+def build_obstacle_lists(data: np.ndarray) -> tuple[list[list[int]], list[list[int]]]:
+    # Sorted obstacle positions per row (column indices) and per column (row indices)
+    obs_per_row = [[] for _ in range(data.shape[0])]
+    obs_per_col = [[] for _ in range(data.shape[1])]
+    for r, c in zip(*np.nonzero(data == ord('#'))):  # row-major order, hence both lists are sorted
+        obs_per_row[r].append(int(c))
+        obs_per_col[c].append(int(r))
+    return obs_per_row, obs_per_col
+
+
+def next_stop(r: int, c: int, dir: int, obs_per_row: list[list[int]], obs_per_col: list[list[int]], extra: tuple[int, int]):
+    """
+    Jump from (r, c) in direction dir to the cell in front of the next obstacle.
+    
+    :param r: current row
+    :param c: current column
+    :param dir: current direction, index into directions
+    :param obs_per_row: sorted obstacle columns per row
+    :param obs_per_col: sorted obstacle rows per column
+    :param extra: position of the additional obstruction
+    :return: position in front of the obstacle or None if the guard leaves the map
+    """
+    if dir == 0:  # up
+        obs = obs_per_col[c]
+        idx = bisect_left(obs, r) - 1
+        stop = obs[idx] if idx >= 0 else -1
+        if extra[1] == c and stop < extra[0] < r:
+            stop = extra[0]
+        return (stop + 1, c) if stop >= 0 else None
+    if dir == 1:  # right
+        obs = obs_per_row[r]
+        idx = bisect_left(obs, c + 1)
+        stop = obs[idx] if idx < len(obs) else -1
+        if extra[0] == r and c < extra[1] and (stop < 0 or extra[1] < stop):
+            stop = extra[1]
+        return (r, stop - 1) if stop >= 0 else None
+    if dir == 2:  # down
+        obs = obs_per_col[c]
+        idx = bisect_left(obs, r + 1)
+        stop = obs[idx] if idx < len(obs) else -1
+        if extra[1] == c and r < extra[0] and (stop < 0 or extra[0] < stop):
+            stop = extra[0]
+        return (stop - 1, c) if stop >= 0 else None
+    # left
+    obs = obs_per_row[r]
+    idx = bisect_left(obs, c) - 1
+    stop = obs[idx] if idx >= 0 else -1
+    if extra[0] == r and stop < extra[1] < c:
+        stop = extra[1]
+    return (r, stop + 1) if stop >= 0 else None
+
+
+def is_loop(r: int, c: int, dir: int, obs_per_row: list[list[int]], obs_per_col: list[list[int]], extra: tuple[int, int], seen: bytearray, num_cols: int) -> bool:
+    """
+    Check if the guard starting at (r, c) in direction dir is trapped in a loop.
+    The guard jumps from obstacle to obstacle. Revisiting a turning point with the same direction closes a loop.
+    
+    :param seen: visited states (row, column, direction), zero on entry and reset to zero on exit
+    :return: True if the guard never leaves the map
+    """
+    touched = []
+    looped = False
+    while True:
+        stop = next_stop(r, c, dir, obs_per_row, obs_per_col, extra)
+        if stop is None:
+            break
+        r, c = stop
+        dir = (dir + 1) % 4
+        state = (r * num_cols + c) * 4 + dir
+        if seen[state]:
+            looped = True
+            break
+        seen[state] = 1
+        touched.append(state)
+
+    # Only reset the states of this walk instead of clearing the whole table
+    for state in touched:
+        seen[state] = 0
+    return looped
+
+
+def count_loop_obstructions(data: np.ndarray) -> int:
+    """
+    Count all positions where a single additional obstruction traps the guard in a loop.
+    
+    Only cells on the original patrol path can change the route. For each of these cells the guard is put on the state
+    right before it first enters the cell, as the route up to there is not affected by the obstruction.
+    From there on, the guard jumps from obstacle to obstacle until it leaves the map or repeats a turning point.
+    
+    :param data: character codes of the map, see load_char_grid
+    :return: number of possible obstruction positions
+    """
+    num_rows, num_cols = data.shape
+    obs_per_row, obs_per_col = build_obstacle_lists(data)
+    blocked = (data == ord('#')).tolist()
+    start = np.argwhere(data == ord('^'))[0]
+
+    # Walk the original route cell by cell and store the state before the first visit of every cell
+    r, c, dir = int(start[0]), int(start[1]), 0
+    visited = np.zeros(data.shape, dtype=bool)
+    visited[r, c] = True  # the starting position cannot be obstructed
+    candidates = []
+    while True:
+        nr, nc = r + directions[dir][0], c + directions[dir][1]
+        if not (0 <= nr < num_rows and 0 <= nc < num_cols):
+            break
+        if blocked[nr][nc]:
+            dir = (dir + 1) % 4
+            continue
+        if not visited[nr, nc]:
+            visited[nr, nc] = True
+            candidates.append((r, c, dir, (nr, nc)))
+        r, c = nr, nc
+
+    seen = bytearray(num_rows * num_cols * 4)
+    return sum(is_loop(r, c, dir, obs_per_row, obs_per_col, extra, seen, num_cols) for r, c, dir, extra in candidates)
+
 
 def part2(filename: str):
-    # Implementation for part 2
-    pass
+    # Find all positions for a new obstruction that trap the guard in a loop
+    data = load_char_grid(filename)
+    return count_loop_obstructions(data)
 
 if __name__ == "__main__":
     assert part1('./2024/06_test.txt') == 41
     start_time = time.time()
     print(f"Part 1 - Input: {part1('./2024/06_input.txt')} -> t = {time.time() - start_time} seconds.")    
     
-    assert part2('./2024/06_test.txt') == 'TODO'
+    assert part2('./2024/06_test.txt') == 6
     start_time = time.time()
     print(f"Part 2 - Input: {part2('./2024/06_input.txt')} -> t = {time.time() - start_time} seconds.")
\ No newline at end of file
@@ -1,3 +1,12 @@
+import numpy as np
+import mmap
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import parse_ints
+
+
 def turn_dial (pos: int, distance: str) -> int:
     max_pos = 99
 
@@ -32,6 +41,72 @@ def eval_file(filename: str):
         print(f"File {filename}: \t Final pos {positions[-1]} \t --- \t NOFzeros: {positions.count(0)} \t --- \t NOFzc: {total_zc}")
 
 
+def parse_rotations(buffer) -> np.ndarray:
+    # Convert all rotations "L68", "R48", ... into one signed array: R -> positive, L -> negative
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    directions = chars[(chars == ord('L')) | (chars == ord('R'))]
+    del chars  # release the view of the buffer
+    return np.where(directions == ord('R'), 1, -1) * parse_ints(buffer)
+
+
+def turn_dial_batch(pos: int, distances: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized version of turn_dial for a whole sequence of rotations.
+    
+    :param pos: starting position of the dial
+    :param distances: signed rotations (R -> positive, L -> negative)
+    :return: resting position and number of zero crossings after each rotation
+    """
+    max_pos = 99
+
+    # Part A: Resting positions are the cumulative sum of all rotations
+    positions = (pos + np.cumsum(distances)) % (max_pos + 1)
+    previous = np.concatenate([[pos], positions[:-1]])
+
+    # Part B: Same rule as in turn_dial, applied to all rotations at once
+    new_pos = previous + distances
+    zero_crossings = np.abs(new_pos) // (max_pos + 1) + ((previous > 0) & (new_pos <= 0))
+    return positions, zero_crossings
+
+
+def eval_file_batch(filename: str, chunk_size: int = 1 << 24):
+    """
+    Same evaluation as eval_file, but all rotations of a chunk are processed at once.
+    The file is memory-mapped and processed in chunks of whole lines, the dial position is carried between chunks.
+    
+    :param filename: name of the input file
+    :param chunk_size: approximate number of bytes per chunk, bounds the memory usage
+    :return: final position, number of zeros, number of zero crossings
+    """
+    pos = 50
+    nof_zeros = 0
+    total_zc = 0
+    with open(filename, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return pos, nof_zeros, total_zc
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            start = 0
+            while start < len(memory):
+                # Cut every chunk behind a line break, so no rotation is split
+                end = min(start + chunk_size, len(memory))
+                if end < len(memory):
+                    line_end = memory.rfind(b'\n', start, end)
+                    if line_end < 0:
+                        line_end = memory.find(b'\n', end)  # a single line longer than the chunk
+                    end = len(memory) if line_end < 0 else line_end + 1
+                distances = parse_rotations(memory[start:end])
+                start = end
+                if len(distances) == 0:
+                    continue
+                positions, zero_crossings = turn_dial_batch(pos, distances)
+                pos = int(positions[-1])
+                nof_zeros += int(np.count_nonzero(positions == 0))
+                total_zc += int(np.sum(zero_crossings))
+
+    print(f"File {filename}: \t Final pos {pos} \t --- \t NOFzeros: {nof_zeros} \t --- \t NOFzc: {total_zc}")
+    return pos, nof_zeros, total_zc
+
+
 if __name__ == "__main__":
     # Tests
     assert turn_dial(50, 'R10') == (60, 0)
@@ -44,6 +119,13 @@ if __name__ == "__main__":
     assert turn_dial(0, 'R200') == (0, 2)
     assert turn_dial(99, 'R101') == (0, 2)
 
+    # The batch version has to match turn_dial, including all edge cases above
+    for pos, distance in [(50, 'R10'), (50, 'R60'), (50, 'L1000'), (0, 'L100'), (99, 'R1'), (10, 'L220'), (0, 'R100'), (0, 'R200'), (99, 'R101'), (0, 'L1'), (1, 'L1')]:
+        positions, zero_crossings = turn_dial_batch(pos, parse_rotations(distance.encode()))
+        assert (positions[0], zero_crossings[0]) == turn_dial(pos, distance)
+
     # Evaluate data files
     eval_file("./2025/day_01_test.txt")
-    eval_file("./2025/day_01_input.txt")
\ No newline at end of file
+    eval_file("./2025/day_01_input.txt")
+    assert eval_file_batch("./2025/day_01_test.txt") == (32, 3, 6)
+    eval_file_batch("./2025/day_01_input.txt")
\ No newline at end of file
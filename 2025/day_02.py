@@ -1,4 +1,5 @@
 import re
+from math import prod
 
 
 # Task 1: Exactly 2 occurences of any digit sequnence
@@ -16,29 +17,108 @@ regex_task_1 = r'^(\d+)\1$'  # Part 1: Exactly 2 Occurences
 regex_task_2 = r'^(\d+)\1+$' # Part 2: At least 2 Occurences
 
 
-def is_valid_id(id:int) -> bool:
+def is_valid_id(id:int, exactly_twice: bool = False) -> bool:
     # Convert to string to use regex.
     # Leading zeros are already removed by str -> int -> str conversion.
     # The regex checks for recurring sequences that both start AND end the string.
-    if re.search(regex_task_2, str(id)):  # TODO: Change between "regex_task_1" for Part 1 and "regex_task_2" for Part 2
+    # exactly_twice selects "regex_task_1" for Part 1, otherwise "regex_task_2" for Part 2 is used
+    if re.search(regex_task_1 if exactly_twice else regex_task_2, str(id)):
         return False
     return True
 
 
-def get_invalid_ids_in_range(start:int, end:int) -> list[int]:    
-    return [entry for entry in range(start, end + 1) if not is_valid_id(entry)]  # Return invalid IDs
+def get_invalid_ids_in_range(start:int, end:int, exactly_twice: bool = False) -> list[int]:    
+    return [entry for entry in range(start, end + 1) if not is_valid_id(entry, exactly_twice)]  # Return invalid IDs
 
 
-def get_invalid_ids_from_file(filename: str) -> list[int]:
+def get_invalid_ids_from_file(filename: str, exactly_twice: bool = False) -> list[int]:
     invalid_ids = []
     with open(filename, "r") as file:
         data = file.read().strip().split(",")
         for id_str in data:
             start, end = id_str.split("-")
-            invalid_ids.extend(get_invalid_ids_in_range(int(start), int(end)))
+            invalid_ids.extend(get_invalid_ids_in_range(int(start), int(end), exactly_twice))
     return invalid_ids
 
 
+# Arithmetic approach without enumerating the ranges:
+# An ID with L digits that consists of a block of b digits repeated L/b times equals block * M with the repunit-style multiplier
+#   M = (10^L - 1) / (10^b - 1)     e.g. L = 6, b = 2 -> M = 10101 -> 12 * 10101 = 121212
+# Hence, all these IDs within a range are an arithmetic sequence of blocks, whose sum and count are known in closed form.
+#
+# Task 2 allows any b that divides L (b < L). An ID with block length b also repeats every multiple of b that divides L
+# (e.g. 111111 for b = 1, 2, 3). To count every ID once, inclusion-exclusion over the prime factors p of L is applied:
+# the IDs repeating with block length L/p and L/q are exactly those repeating with block length L/(p*q).
+
+
+def sum_repeated_blocks(start: int, end: int, num_digits: int, block_length: int) -> tuple[int, int]:
+    # Sum and count of all IDs in [start, end] with num_digits digits that repeat a block of block_length digits
+    multiplier = (10**num_digits - 1) // (10**block_length - 1)
+    block_min = max(10**(block_length - 1), -(-start // multiplier))
+    block_max = min(10**block_length - 1, end // multiplier)
+    if block_min > block_max:
+        return 0, 0
+    count = block_max - block_min + 1
+    return multiplier * (block_min + block_max) * count // 2, count
+
+
+def prime_factors(n: int) -> list[int]:
+    factors = []
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            factors.append(p)
+            while n % p == 0:
+                n //= p
+        p += 1
+    if n > 1:
+        factors.append(n)
+    return factors
+
+
+def sum_invalid_ids_in_range(start: int, end: int, exactly_twice: bool = False) -> tuple[int, int]:
+    """
+    Sum and count of all invalid IDs in [start, end] without enumerating the range.
+    
+    :param start: first ID of the range
+    :param end: last ID of the range (inclusive)
+    :param exactly_twice: True -> a block has to occur exactly twice (Part 1), False -> at least twice (Part 2)
+    :return: sum of all invalid IDs, number of invalid IDs
+    """
+    total, count = 0, 0
+    for num_digits in range(len(str(start)), len(str(end)) + 1):
+        lower = max(start, 10**(num_digits - 1))
+        upper = min(end, 10**num_digits - 1)
+
+        # (block length, sign) for the inclusion-exclusion
+        if exactly_twice:
+            terms = [(num_digits // 2, 1)] if num_digits % 2 == 0 else []
+        else:
+            primes = prime_factors(num_digits)
+            terms = []
+            for mask in range(1, 2**len(primes)):
+                subset = [p for i, p in enumerate(primes) if mask >> i & 1]
+                terms.append((num_digits // prod(subset), (-1)**(len(subset) + 1)))
+
+        for block_length, sign in terms:
+            block_sum, block_count = sum_repeated_blocks(lower, upper, num_digits, block_length)
+            total += sign * block_sum
+            count += sign * block_count
+    return total, count
+
+
+def sum_invalid_ids_from_file(filename: str, exactly_twice: bool = False) -> tuple[int, int]:
+    total, count = 0, 0
+    with open(filename, "r") as file:
+        data = file.read().strip().split(",")
+        for id_str in data:
+            start, end = id_str.split("-")
+            range_sum, range_count = sum_invalid_ids_in_range(int(start), int(end), exactly_twice)
+            total += range_sum
+            count += range_count
+    return total, count
+
+
 if __name__ == "__main__":
     # Tests (Both Tasks):
     assert is_valid_id(123123) == False
@@ -47,10 +127,18 @@ if __name__ == "__main__":
     assert is_valid_id(1231232) == True
 
     # Tests (Task 1):
-    # assert is_valid_id(123123123) == True
+    assert is_valid_id(123123123, exactly_twice=True) == True
 
     # Tests (Task 2):
-    # assert is_valid_id(123123123) == False
+    assert is_valid_id(123123123) == False
+
+    # The arithmetic approach has to match the enumeration
+    for exactly_twice in (True, False):
+        for start, end in [(1, 10**6), (95, 115), (998, 1012), (222220, 222224), (1188511880, 1188511890)]:
+            invalid_ids = get_invalid_ids_in_range(start, end, exactly_twice)
+            assert sum_invalid_ids_in_range(start, end, exactly_twice) == (sum(invalid_ids), len(invalid_ids))
 
-    print("Test data:", sum(get_invalid_ids_from_file("./2025/day_02_test.txt")))
-    print("Input data:", sum(get_invalid_ids_from_file("./2025/day_02_input.txt")))
\ No newline at end of file
+    assert sum_invalid_ids_from_file("./2025/day_02_test.txt", exactly_twice=True)[0] == 1227775554
+    assert sum_invalid_ids_from_file("./2025/day_02_test.txt")[0] == 4174379265
+    print("Part 1 - Input data:", sum_invalid_ids_from_file("./2025/day_02_input.txt", exactly_twice=True)[0])
+    print("Part 2 - Input data:", sum_invalid_ids_from_file("./2025/day_02_input.txt")[0])
\ No newline at end of file
@@ -1,28 +1,84 @@
 import numpy as np
 import time
 
+def select_largest_subsequence(digits: np.ndarray, length: int) -> np.ndarray:
+    """
+    Select the largest subsequence of the given length with a greedy monotonic stack in a single pass.
+    A digit removes all smaller digits before it from the stack, as long as enough digits are left to fill the sequence.
+    
+    :param digits: digits of the line as uint8 values
+    :param length: number of digits to select
+    :return: selected digits
+    """
+    drops = len(digits) - length  # number of digits that can be skipped
+    stack = []
+    for d in digits.tolist():
+        while drops > 0 and stack and stack[-1] < d:
+            stack.pop()
+            drops -= 1
+        stack.append(d)
+    return np.array(stack[:length], dtype=np.uint8)
+
+
+def select_largest_subsequences(digits: np.ndarray, length: int) -> np.ndarray:
+    """
+    Batch version of select_largest_subsequence for equally long lines. Every line has its own stack, all stacks are updated column by column.
+    
+    :param digits: digits of all lines as uint8 values -> shape (num_lines, line_length)
+    :param length: number of digits to select per line
+    :return: selected digits -> shape (num_lines, length)
+    """
+    num_lines, line_length = digits.shape
+    rows = np.arange(num_lines)
+    stacks = np.zeros((num_lines, line_length), dtype=np.uint8)
+    top = np.zeros(num_lines, dtype=np.int64)  # number of digits on each stack
+    drops = np.full(num_lines, line_length - length, dtype=np.int64)
+    for col in range(line_length):
+        d = digits[:, col]
+        # Pop all lines at once, until no line can remove a smaller digit anymore
+        while True:
+            pop = (top > 0) & (drops > 0) & (stacks[rows, np.maximum(top - 1, 0)] < d)
+            if not pop.any():
+                break
+            top -= pop
+            drops -= pop
+        stacks[rows, top] = d
+        top += 1
+    return stacks[:, :length]
+
+
+def digits_to_int(digits: np.ndarray) -> int:
+    # Join the digits to an integer. Python integers are used, so any joltage length is supported.
+    return int((digits + ord('0')).tobytes())
+
+
 def find_joltage_in_line(input: str, joltage_length:int) -> int:
     if(len(input) < joltage_length):
         return 0 # Not enough digits to form a joltage of the requested length
-    digits = np.array(list(input), dtype=str)  # Split the string into individual characters for easy indexing
-    positions = np.arange(len(input) - joltage_length, len(input))  # Initialize the solution at the end of the line and work backwards
-    positions[0] = np.argmax(digits[0:positions[0] + 1])  # Find the first max in the range from start to the first position
-    for i in range(1, len(positions)):
-        # Find the next maximum in between the previous position and the current position
-        positions[i] = positions[i-1] +1 + np.argmax(digits[positions[i-1]+1:positions[i]+1])  # Offset by previous max position +1 as the argmax is using local indexing
-    return int(''.join(digits[positions]))  # return as joined integer
+    digits = np.frombuffer(input.encode(), dtype=np.uint8) - ord('0')
+    return digits_to_int(select_largest_subsequence(digits, joltage_length))
 
 
 def get_joltages_from_file(filename: str, joltage_length :int = 12) -> int:
     joltages = []  # Store all joltages found in the file (as we only need the sum at the end it would be more efficient to sum directly, but this is clearer to keep track of intermediate results)
     with open(filename) as f:
-        lines = f.readlines()
-        for line in lines:
-            joltages.append(find_joltage_in_line(line.strip(), joltage_length))
+        lines = [line.strip() for line in f.readlines()]
+
+    # Equally long lines are processed together in a single batch
+    if len(lines) > 0 and len({len(line) for line in lines}) == 1 and len(lines[0]) >= joltage_length:
+        digits = np.frombuffer(''.join(lines).encode(), dtype=np.uint8).reshape(len(lines), -1) - ord('0')
+        return [digits_to_int(row) for row in select_largest_subsequences(digits, joltage_length)]
+
+    for line in lines:
+        joltages.append(find_joltage_in_line(line, joltage_length))
     return joltages
 
 
 if __name__ == "__main__":
+    assert find_joltage_in_line('818181911112111', 12) == 888911112111
+    assert find_joltage_in_line('811111111111119', 2) == 89
+    assert get_joltages_from_file('./2025/day_03_test.txt', 12) == [find_joltage_in_line(line, 12) for line in open('./2025/day_03_test.txt').read().split()]
+
     # Part 1: joltage length 2
     print ("Part 1: joltage length 2")
     start_time = time.time()
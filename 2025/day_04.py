@@ -1,17 +1,24 @@
 import numpy as np
 from scipy import signal
 import time
+import sys
+from pathlib import Path
 
-def remove_boxes_once(data: np.ndarray, max_neighbors:int) -> np.ndarray:
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import count_bits, fewer_neighbors_than, load_bit_grid
+
+def count_neighbors(data: np.ndarray) -> np.ndarray:
     # Convolution kernel to count all neighboring boxes
     kernel = np.array([
         [1, 1, 1],
         [1, 0, 1],
         [1, 1, 1]
     ])
+    return signal.convolve2d(data.astype(int), kernel, mode='same', boundary='fill', fillvalue=0)
 
+def remove_boxes_once(data: np.ndarray, max_neighbors:int) -> np.ndarray:
     # Convolution is applied to all data including empty spaces and is subsequently filtered
-    convolution = signal.convolve2d(data.astype(int), kernel, mode='same', boundary='fill', fillvalue=0)
+    convolution = count_neighbors(data)
     filtered = convolution[np.where(data)]
 
     # Remove possible boxes from the data-grid
@@ -19,7 +26,42 @@ def remove_boxes_once(data: np.ndarray, max_neighbors:int) -> np.ndarray:
 
     return data, np.sum(filtered < max_neighbors)
 
-def remove_boxes(filename: str, max_iter: int = -1):
+
+def remove_boxes_incremental(data: np.ndarray, max_neighbors: int, max_iter: int = -1) -> int:
+    """
+    Remove boxes in rounds like remove_boxes_once, but without convolving the whole grid in every round.
+    
+    The neighbor counts are computed once. Removing a box decrements the counts of its eight neighbors,
+    and only these neighbors can become removable in the next round. Hence, the work per round is proportional
+    to the number of removed boxes instead of the grid size.
+    
+    :param data: boolean grid, boxes are True
+    :param max_neighbors: boxes with fewer neighboring boxes are removed
+    :param max_iter: maximal number of rounds, -1 for no limit
+    :return: number of removed boxes
+    """
+    # Pad by one cell, so all neighbors of a box are valid indices of the flattened grid
+    boxes = np.pad(data, 1).ravel()
+    width = data.shape[1] + 2
+    counts = count_neighbors(np.pad(data, 1)).astype(np.int8).ravel()
+    offsets = np.array([-width - 1, -width, -width + 1, -1, 1, width - 1, width, width + 1])
+
+    nof_boxes_removed = 0
+    iteration = 0
+    removable = np.flatnonzero(boxes & (counts < max_neighbors))
+    while len(removable) > 0 and not (max_iter > 0 and iteration >= max_iter):
+        boxes[removable] = False
+        nof_boxes_removed += len(removable)
+        iteration += 1
+
+        # Update the counts of all neighbors and re-examine only them
+        neighbors, decrements = np.unique((removable[:, None] + offsets).ravel(), return_counts=True)
+        counts[neighbors] -= decrements.astype(np.int8)
+        removable = neighbors[boxes[neighbors] & (counts[neighbors] < max_neighbors)]
+
+    return nof_boxes_removed
+
+def remove_boxes(filename: str, max_iter: int = -1, incremental: bool = True):
     nof_boxes_removed = 0
     iteration = 0
     with open(filename) as file:
@@ -27,6 +69,9 @@ def remove_boxes(filename: str, max_iter: int = -1):
         # For better processing all entries are converted to booleans. Boxes are True, empty spaces are False
         data = np.array([line.strip() for line in file.readlines()])
         data = np.array(np.frombuffer(data, dtype='S4'), dtype=str).reshape(len(data[0]), -1) == '@'
+
+        if incremental:
+            return remove_boxes_incremental(data, 4, max_iter)
         
         # Remove Boxes until no more can be removed or the iteration limit is reached
         while True:
@@ -38,7 +83,33 @@ def remove_boxes(filename: str, max_iter: int = -1):
     
     return nof_boxes_removed
 
+def remove_boxes_packed(filename: str, max_iter: int = -1):
+    """
+    Same as remove_boxes, but for very large maps. The map is loaded from a memory map into a bit-packed grid
+    (one bit per cell) and every round computes the removable boxes with bitwise operations on 64 cells at once.
+    
+    :param filename: name of the input file
+    :param max_iter: maximal number of rounds, -1 for no limit
+    :return: number of removed boxes
+    """
+    boxes, _ = load_bit_grid(filename, '@')
+    nof_boxes_removed = 0
+    iteration = 0
+    while True:
+        removable = boxes & fewer_neighbors_than(boxes, 4)
+        num_removed = count_bits(removable)
+        boxes &= ~removable
+        nof_boxes_removed += num_removed
+        iteration += 1
+        if num_removed == 0 or (max_iter > 0 and iteration >= max_iter):
+            break
+    return nof_boxes_removed
+
+
 if __name__ == "__main__":
+    assert remove_boxes_packed('./2025/day_04_test.txt', 1) == 13
+    assert remove_boxes_packed('./2025/day_04_test.txt') == 43
+
     start_time = time.time()
     print(f"Part 1: {remove_boxes('./2025/day_04_test.txt', 1)} -> t = {time.time() - start_time} seconds.")
     start_time = time.time()
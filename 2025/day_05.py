@@ -1,5 +1,10 @@
 import numpy as np
 import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import parse_ints
 
 
 '''
@@ -15,6 +20,9 @@ Part 1:
     start -> even number -> inside interval
     end -> odd number -> outside interval
 
+    Merging is done with a single sort and a running maximum over the interval ends.
+    All ingredients are tested with one binary search (np.searchsorted) -> O((n + m) log n).
+
 
 Part 2:
         
@@ -24,6 +32,31 @@ Part 2:
 '''
 
 
+def build_interval_index(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    '''
+    Merge overlapping intervals into an array of transition numbers with a single sort.
+
+    After sorting by start, a new merged interval begins wherever a start lies behind the running maximum of all previous (exclusive) ends.
+    Each merged interval ends at the running maximum right before the next begin.
+
+    :param starts: first number of each interval
+    :type starts: np.ndarray
+    :param ends: last number of each interval (inclusive)
+    :type ends: np.ndarray
+    :return: Unique merged intervals as array of numbers [start_unique1, end_unique1, start_unique2, end_unique2, ...] with exclusive ends
+    :rtype: ndarray[(-1,), dtype=int]
+    '''
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = np.argsort(starts, kind='stable')
+    set_in = np.asarray(starts)[order]
+    set_out = np.maximum.accumulate(np.asarray(ends)[order] + 1)  # increase end by one to distinguish between entries and exits
+
+    begins = np.flatnonzero(np.concatenate([[True], set_in[1:] > set_out[:-1]]))
+    last = np.concatenate([begins[1:] - 1, [len(set_in) - 1]])
+    return np.column_stack((set_in[begins], set_out[last])).ravel()
+
+
 def merge_intervals(intervals:np.ndarray) -> np.ndarray:
     '''
     Merge overlapping intervals into an array of unique intervals.
@@ -33,41 +66,8 @@ def merge_intervals(intervals:np.ndarray) -> np.ndarray:
     :return: Unique merged intervals as array of numbers [start_unique1, end_unique1, start_unique2, end_unique2, ...]
     :rtype: ndarray[(-1,), dtype=int]
     '''
-    intervals = np.append(np.array([i.split('-') for i in intervals]).astype(int), values=[[np.inf, np.inf]], axis=0)  # add np.inf as end-of-lne tokens.
-
-    merged = []
-    set_in = np.sort(intervals[:, 0])
-    set_out = np.sort(intervals[:, 1]) + 1  # increase end by one to distinguish between entries and exits
-    # Iterate all entries and count the number of open intervals. 
-    # Numbers in the "set_in" increase the number of open intervals, numbers in the "set_out" decrease it.
-    # reducing the count to zero means that all intervals are closed, so we can add the current number as an end of the current interval.
-    # Similarly, increasing the count from zero means that a new interval is opened, so we need to add the current number as a start of a merged interval.
-    count = 0
-    idx_in = 1
-    idx_out = 1
-    next_in = set_in[0]
-    next_out = set_out[0]
-    while next_in != np.inf or next_out != np.inf:
-        if next_in <= next_out:
-            count += 1
-
-            if count == 1:
-                merged = np.append(merged, next_in)
-            
-            next_in = set_in[idx_in]
-            idx_in += 1
-
-
-        else:
-            count -= 1
-
-            if count == 0:
-                merged = np.append(merged, next_out)
-            
-            next_out = set_out[idx_out]
-            idx_out += 1
-
-    return merged
+    bounds = parse_ints(','.join(intervals)).reshape(-1, 2)
+    return build_interval_index(bounds[:, 0], bounds[:, 1])
 
 
 def test_ingredient(ingredient:int, intervals:np.ndarray) -> bool:
@@ -81,27 +81,45 @@ def test_ingredient(ingredient:int, intervals:np.ndarray) -> bool:
     :return: True if ingredient is fresh, False if spoiled
     :rtype: bool
     '''
-    tmp = np.sum(intervals < ingredient) % 2
-    return np.sum(intervals < ingredient) % 2
+    return test_ingredients(np.array([ingredient]), intervals)[0]
+
+
+def test_ingredients(ingredients:np.ndarray, intervals:np.ndarray) -> np.ndarray:
+    '''
+    Batch version of test_ingredient. The number of transitions up to each ingredient is found with a binary search,
+    an odd number means that the ingredient lies inside an interval.
+    
+    :param ingredients: ingredient numbers to test
+    :type ingredients: np.ndarray
+    :param intervals: merged intervals as array of numbers [start1, end1, start2, end2, ...]
+    :type intervals: np.ndarray
+    :return: True for every fresh ingredient, False for every spoiled one
+    :rtype: ndarray[(-1,), dtype=bool]
+    '''
+    return np.searchsorted(intervals, ingredients, side='right') % 2 == 1
+
+
+def load_database(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    # Load the ranges as array of shape (num_ranges, 2) and the ingredients
+    with open(filename, 'rb') as file:
+        data = file.read().replace(b'\r', b'')
+    cutoff = data.find(b'\n\n')
+    return parse_ints(data[:cutoff]).reshape(-1, 2), parse_ints(data[cutoff + 2:])
 
 
 def part1(filename: str):
     # Combine all ranges and test ingredients against the combined ranges to find out which are fresh and which are spoiled.
-    with open(filename, 'r') as file:
-        data = np.array([line.strip() for line in file.readlines()])
-        cutoff = np.where(data == '')[0][0]
-        intervals = merge_intervals(data[:cutoff])
-        results = [test_ingredient(int(i), intervals) for i in data[cutoff+1:]]
+    ranges, ingredients = load_database(filename)
+    intervals = build_interval_index(ranges[:, 0], ranges[:, 1])
+    results = test_ingredients(ingredients, intervals)
 
     return np.sum(results)
 
 
 def part2(filename: str):
     # count the number of fresh ingredients
-    with open(filename, 'r') as file:
-        data = np.array([line.strip() for line in file.readlines()])
-        cutoff = np.where(data == '')[0][0]
-        intervals = merge_intervals(data[:cutoff]).reshape(-1, 2)
+    ranges, _ = load_database(filename)
+    intervals = build_interval_index(ranges[:, 0], ranges[:, 1]).reshape(-1, 2)
     return int(np.sum(intervals[:, 1] - intervals[:, 0]))
 
 
@@ -1,6 +1,11 @@
 import numpy as np
 import time
-import re
+import sys
+from math import prod
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import load_char_grid
 
 def part1(filename: str):
     # Apply sums and products to each collumn of numbers.
@@ -17,30 +22,57 @@ def part1(filename: str):
     return np.sum(results)
 
 
+def read_worksheet_columns(grid: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read a worksheet column-wise. Every non-blank column holds one number, its digits are read top to bottom.
+    Groups of numbers are separated by blank columns, the operation of each group is located below its first column.
+
+    :param grid: character codes of the worksheet, the last row contains the operations
+    :return: numbers of all non-blank columns, index of the first number of each group and the operation of each group
+    """
+    rows = grid[:-1]
+    is_digit = (rows >= ord('0')) & (rows <= ord('9'))
+    # Positional value of each digit: the number of digits below it in the same column.
+    exponents = np.cumsum(is_digit[::-1], axis=0)[::-1] - is_digit
+    columns = np.sum(np.where(is_digit, (rows.astype(np.int64) - ord('0')) * 10 ** exponents, 0), axis=0)
+
+    # Separators are blank in every row, a group starts at every non-blank column right of a separator (or at the left edge).
+    blank = np.all(grid == ord(' '), axis=0)
+    first = ~blank & np.append(True, blank[:-1])
+    group_starts = np.flatnonzero(first[~blank])
+    return columns[~blank], group_starts, grid[-1, first]
+
+
+def evaluate_groups(numbers: np.ndarray, group_starts: np.ndarray, operations: np.ndarray) -> int:
+    """
+    Sum or multiply every group of numbers and add up all results.
+    Products that could exceed int64 (estimated via the sum of logarithms) are recomputed with exact Python integers.
+
+    :param numbers: numbers of all groups, one after another
+    :param group_starts: index of the first number of each group
+    :param operations: character code of the operation of each group (+ or *)
+    :return: sum of all group results
+    """
+    sums = np.add.reduceat(numbers, group_starts)
+    products = np.multiply.reduceat(numbers, group_starts)
+    is_sum = operations == ord('+')
+
+    magnitude = np.add.reduceat(np.log2(np.maximum(numbers, 1)), group_starts)
+    overflow = np.flatnonzero(~is_sum & (magnitude >= 62))
+    group_ends = np.append(group_starts[1:], len(numbers))
+    exact = sum(prod(numbers[group_starts[i]:group_ends[i]].tolist()) for i in overflow)
+
+    is_product = ~is_sum
+    is_product[overflow] = False
+    return sum(sums[is_sum].tolist()) + sum(products[is_product].tolist()) + exact
+
+
 def part2(filename: str):
     # Apply sums and products to each group of numbers separated by blank columns. Numbers are read column-wise, NOT line-wise.
-    with open(filename, 'r') as file:
-        # Read Lines and remove endline characters. Additionally, separate the last line containing the operations.
-        data = np.array([line[:-1] for line in file.readlines()])
-        operations = np.array(data[-1].split())
-        
-        # Split data by characters to keep the exact location of each digit.
-        # Then, all numbers can be read column-wise by joining the individual characters.
-        data = np.array(np.frombuffer(data[:-1], dtype='S4'), dtype=str).reshape(-1, len(data[0]))
-        data = np.append(np.array([''.join(data[:, idx]) for idx in range(data.shape[1])]), ' ')
-
-        # Find all sepearators (blank columns) and split the data accordingly.
-        splits = np.where(np.array([re.search(r'^\s+$', d) for d in data], dtype=bool))[0] + 1
-        data = [d[:-1].astype(int) for d in np.split(data, splits)]
-        
-        # Apply operations to each group of numbers.
-        results = np.array([])
-        for i in range(operations.shape[0]):
-            if operations[i] == '+':
-                results = np.append(results, np.sum(data[i]))
-            else: # operations[i] == '*'
-                results = np.append(results, np.prod(data[i]))
-    return np.sum(results, dtype=int)
+    grid = load_char_grid(filename)
+    numbers, group_starts, operations = read_worksheet_columns(grid)
+    return evaluate_groups(numbers, group_starts, operations)
+
 
 if __name__ == "__main__":
     assert part1('./2025/day_06_test.txt') == 4277556
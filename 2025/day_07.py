@@ -2,34 +2,35 @@ import numpy as np
 import time
 
 
-def split_rays(current_rays: np.ndarray, splitter_positions: np.ndarray) -> np.ndarray:
+# Translation tables turning a line into a binary number, e.g. b'..^.' -> b'0010' for the splitters.
+SPLITTER_BITS = bytes(ord('1') if c == ord('^') else ord('0') for c in range(256))
+START_BITS = bytes(ord('1') if c == ord('S') else ord('0') for c in range(256))
+
+
+def split_rays(current_rays: int, splitter_positions: int, width: int) -> tuple[int, int]:
     # Split all current rays '|' if they hit a splitter '^'.
     #  |            |
     #  ^    ->     |^|
-    if current_rays.shape != splitter_positions.shape:
-        raise ValueError("Current rays and splitter positions must have the same shape.")
-    hits = np.where((current_rays == '|') & (splitter_positions == '^'))[0]
-    for hit in hits:
-        if hit < current_rays.shape[0] - 1:
-            current_rays[hit + 1] = '|'
-        if hit > 0:
-            current_rays[hit - 1] = '|'
-        current_rays[hit] = '^'
-    return current_rays, len(hits)
+    # Rays and splitters of a layer are bitsets (one bit per column), so all rays of a layer are split at once.
+    # Adjacent splitters: a ray that is split onto a neighboring splitter continues below it, e.g. rays on '^^' -> '||||'.
+    hits = current_rays & splitter_positions
+    current_rays = (current_rays & ~hits) | (hits << 1) | (hits >> 1)
+    return current_rays & ((1 << width) - 1), hits.bit_count()
 
 
 def part1(filename: str):
     # Return the total number of times, the initial ray is split.
     total_hits = 0
-    with open(filename, 'r') as f:
-        data = np.array(f.read().strip().splitlines())
+    with open(filename, 'rb') as f:
+        data = f.read().replace(b'\r', b'').strip().splitlines()
         # Read the initial rays and process each layer of splitters.
-        rays = np.frombuffer(data[0], dtype='S4').astype(str)
-        rays[rays == 'S'] = '|'
+        width = len(data[0])
+        rays = int(data[0].translate(START_BITS), 2)
         for line in data[1:]:
-            splitter = np.frombuffer(line, dtype='S4').astype(str)
-            rays, nof_hits = split_rays(rays, splitter)
-            total_hits += nof_hits
+            splitter = int(line.translate(SPLITTER_BITS), 2)
+            if splitter:
+                rays, nof_hits = split_rays(rays, splitter, width)
+                total_hits += nof_hits
     return total_hits
 
 
@@ -63,6 +64,8 @@ def part2(filename: str):
     return total_timelines
 
 if __name__ == "__main__":
+    # Two rays hitting adjacent splitters: both are split, the inner halves continue below the splitters (..||.. on ..^^.. -> .||||.)
+    assert split_rays(int('0011000', 2), int('0011000', 2), 7) == (int('0111100', 2), 2)
     assert part1('./2025/day_07_test.txt') == 21
     start_time = time.time()
     print(f"Part 1: {part1('./2025/day_07_input.txt')} -> t = {time.time() - start_time} seconds.")
@@ -1,7 +1,91 @@
 import numpy as np
 import time
+import sys
+from pathlib import Path
 
-def connect_junctions(data: np.ndarray, num_connections: int = -1):
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import DisjointSet, KDTree, load_int_columns
+
+
+def closest_pairs(data: np.ndarray, num_pairs: int) -> np.ndarray:
+    """
+    Find the num_pairs closest pairs of junctions from the k nearest neighbors of every junction.
+    A pair missing from the neighbor lists is at least as far apart as the k-th neighbor of both junctions. Hence, only junctions whose
+    k-th neighbor is not farther than the current num_pairs-th candidate can miss a pair, and only their neighbor lists are widened.
+    
+    :param data: array of 3D junction coordinates -> shape (num_junctions, 3)
+    :type data: np.ndarray
+    :param num_pairs: number of pairs
+    :type num_pairs: int
+    :return: pairs (i < j) of junction indices -> shape (num_pairs, 2), ordered by (distance, i, j)
+    :rtype: np.ndarray
+    """
+    num_junctions = len(data)
+    num_pairs = min(num_pairs, num_junctions * (num_junctions - 1) // 2)
+    tree = KDTree(data)
+    # Every junction is part of 2 * num_pairs / num_junctions pairs on average
+    k = min(num_junctions - 1, max(1, -(-2 * num_pairs // num_junctions)))
+    queries = None
+    keys, distances2 = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    reach = np.zeros(num_junctions, dtype=np.int64)  # squared distance of the k-th neighbor, everything closer is known
+    while True:
+        idx_x, neighbors, neighbor_distances2 = tree.knn(k, queries)
+        reach[idx_x] = neighbor_distances2[:, -1] if k < num_junctions - 1 else np.iinfo(np.int64).max
+        # Each pair as single key i * num_junctions + j with i < j, pairs found from both sides are merged
+        pair_x, pair_y = np.repeat(idx_x, k), neighbors.ravel()
+        keys, unique = np.unique(np.concatenate((keys, np.minimum(pair_x, pair_y) * num_junctions + np.maximum(pair_x, pair_y))), return_index=True)
+        distances2 = np.concatenate((distances2, neighbor_distances2.ravel()))[unique]
+
+        order = np.lexsort((keys, distances2))[:num_pairs]
+        queries = np.flatnonzero(reach <= distances2[order[-1]]) if len(order) == num_pairs else np.arange(num_junctions)
+        if len(queries) == 0:
+            return np.column_stack((keys[order] // num_junctions, keys[order] % num_junctions))
+        k = min(num_junctions - 1, 2 * k)
+
+
+def minimum_spanning_pairs(data: np.ndarray) -> np.ndarray:
+    """
+    Find the pairs of junctions that connect all junctions into a single circuit, as they are applied by connecting the closest pairs first.
+    Borůvka's algorithm: in every round each circuit is connected to its nearest junction outside of it, which at least halves the number
+    of circuits. The nearest outside junction is only searched among the junctions of other circuits, and the search of a circuit stops
+    as soon as none of its junctions can get closer, so junctions deep inside of a large circuit are skipped quickly.
+    
+    :param data: array of 3D junction coordinates -> shape (num_junctions, 3)
+    :type data: np.ndarray
+    :return: pairs (i < j) of junction indices -> shape (num_junctions - 1, 2), ordered by (distance, i, j)
+    :rtype: np.ndarray
+    """
+    num_junctions = len(data)
+    tree = KDTree(data)
+    circuits = DisjointSet(num_junctions)
+    pairs, distances2 = [], []
+    while circuits.count > 1:
+        labels = np.array([circuits.find(i) for i in range(num_junctions)])
+        nearest, nearest_distances2 = tree.nearest_outside(labels)
+        found = np.flatnonzero(nearest >= 0)
+        idx_x, idx_y = np.minimum(found, nearest[found]), np.maximum(found, nearest[found])
+        # Closest pair per circuit, ties are broken by (i, j) like in the sorted order of all pairs
+        order = np.lexsort((idx_y, idx_x, nearest_distances2[found], labels[found]))
+        first = order[np.r_[True, np.diff(labels[found][order]) != 0]]
+        for x, y, d2 in zip(idx_x[first].tolist(), idx_y[first].tolist(), nearest_distances2[found][first].tolist()):
+            # Both circuits of a pair may have chosen it
+            if circuits.union(x, y):
+                pairs.append((x, y))
+                distances2.append(d2)
+
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0], distances2))]
+
+
+def pairs_by_distance_dense(data: np.ndarray) -> np.ndarray:
+    # Reference without spatial index: all n*(n-1)/2 pairs are computed and sorted at once -> O(n^2) memory.
+    idx_x, idx_y = np.triu_indices(len(data), 1)
+    distances2 = np.sum((data[idx_x].astype(np.int64) - data[idx_y]) ** 2, axis=1)
+    order = np.lexsort((idx_y, idx_x, distances2))
+    return np.column_stack((idx_x[order], idx_y[order]))
+
+
+def connect_junctions(data: np.ndarray, num_connections: int = -1, spatial_index: bool = True):
     """
     Find connections between junctions based on their pairwise distances.
     Either fit a given number of connections or connect all junctions into a single circuit.
@@ -10,59 +94,44 @@ def connect_junctions(data: np.ndarray, num_connections: int = -1):
     :type data: np.ndarray
     :param num_connections: num of connections applied to the input. If -1, connections are applied, until all junctions are within the same circuit.
     :type num_connections: int
+    :param spatial_index: find the closest pairs with a k-d tree (memory linear in the number of junctions and connections) instead of sorting all pairwise distances
+    :type spatial_index: bool
     """
-    # Calculate all pairwise distances
-    # As shorter distances are more relevant, indices contains a list of junction-pairs that is sorted by distance. Attention, that self-distances (0) are also included!
-    distance_vecs = data[:, None, :] - data[None, :, :]    
-    distance_norms = np.linalg.norm(distance_vecs, axis = 2)
-    indices = np.array(np.unravel_index(np.argsort(distance_norms, axis=None), distance_norms.shape)).T[::2,:]
+    if len(data) < 2:
+        raise ValueError(f"At least two junctions are needed to connect them, got {len(data)}.")
+
+    # Pairs of junctions sorted by distance (shortest first). Self-distances are never part of them.
+    # Connecting all junctions only needs the pairs that join two circuits, i.e. the minimum spanning tree.
+    if not spatial_index:
+        pairs = pairs_by_distance_dense(data)
+    elif num_connections > 0:
+        pairs = closest_pairs(data, num_connections)
+    else:
+        pairs = minimum_spanning_pairs(data)
 
     # Initialize the circuits. Initially, each junction is its own circuit.
-    # circuits stores a list of junction for each circuit
-    # junctions stores the circuit index for each junction
-    # This allow bidirectional access between junctions and circuits
-    circuits = {}
-    for i in range( len(data)):
-        circuits[i] = list([i])
-    junctions = np.arange(len(data))  # each point is its own junction initially
-
-    # iterate over the sorted distances but drop self-distances (idx_x == idx_y), as these are always zero!
+    # The circuits are kept as disjoint sets, so merging two circuits never relabels their junctions.
+    circuits = DisjointSet(len(data))
+
+    # iterate over the sorted pairs
     connections_count = 0
     
-    for i in range(len(indices)):
+    for idx_x, idx_y in pairs.tolist():
         # Stop if the requested number of connections is reached or if all junctions are connected
         if num_connections > 0 and connections_count >= num_connections:
             break
-        if len(circuits) <= 1:
+        if circuits.count <= 1:
             break
 
-        # Get the next closest pair of junctions and ignore self-distances (idx_x == idx_y) 
-        idx_x = indices[i, 0] 
-        idx_y = indices[i, 1]
-        if idx_x == idx_y:
-            continue
-
-        min_j = min(junctions[idx_x], junctions[idx_y])
-        max_j = max(junctions[idx_x], junctions[idx_y])  
+        # Connect the next closest pair of junctions. Connections within the same circuit are counted as well, but do not change any circuit.
         connections_count += 1
-
-        # Skip connections if there junctions are already connected via other connections
-        if min_j == max_j:
-            continue
-
-        # Merge the two circuits
-        circuits[min_j] += circuits[max_j]
-        for idx in circuits[max_j]:
-            junctions[idx] = min_j
-        circuits.pop(max_j)
-        
-    # sort circuits by size to find the largest ones.
-    circuit_sizes = np.sort([len(circuit) for circuit in circuits.values()])        
+        last_x, last_y = idx_x, idx_y
+        circuits.union(idx_x, idx_y)
 
     # Return: 
     # Task 1 - multiply sizes of the three largest circuits    
     # Task 2 - Return the product of the final junctions x-coordinates
-    return np.prod(circuit_sizes[-3:]) , data[idx_x, 0] * data[idx_y, 0]
+    return np.prod(circuits.largest_sizes(3)) , data[last_x, 0] * data[last_y, 0]
 
 
 def connect_junctions_from_file(filename: str, num_connections: int = -1):
@@ -74,10 +143,8 @@ def connect_junctions_from_file(filename: str, num_connections: int = -1):
     :param num_connections: num of connections applied to the input. If -1, connections are applied, until all junctions are within the same circuit.
     :type num_connections: int
     """  
-    with open(filename, 'r') as f:
-        data = f.read().strip().splitlines()
-        data = np.array([s.split(',') for s in data], dtype=int)
-        return connect_junctions(data, num_connections)
+    data = load_int_columns(filename)
+    return connect_junctions(data, num_connections)
 
 
 if __name__ == "__main__":
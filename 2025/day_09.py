@@ -1,28 +1,123 @@
 import numpy as np
 import time
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import load_int_columns
 
-def find_largest_rect(positions: np.ndarray):
-    # Find all unique pairs of positions
-    unique_idcs = np.triu_indices(len(positions), k=1)
 
-    # Calculate distances between all unique pairs
-    distances = np.abs(positions[:, None, :] - (positions[None, :, :] ))+ 1
-    unique_distances = distances[unique_idcs]
+def find_largest_rect(positions: np.ndarray, staircases: bool = True):
+    """
+    Find the largest rectangle spanned by two positions as opposite corners.
+    
+    :param positions: array of 2D positions -> shape (num_positions, 2)
+    :type positions: np.ndarray
+    :param staircases: only compare the staircase chains of the positions (near-linear), otherwise all pairs are evaluated at once (O(n^2) memory)
+    :type staircases: bool
+    """
+    if not staircases:
+        # Find all unique pairs of positions
+        unique_idcs = np.triu_indices(len(positions), k=1)
 
-    # Calculate areas of rectangles formed by each unique pair
-    areas = np.multiply(unique_distances[:, 0], unique_distances[:, 1])
+        # Calculate distances between all unique pairs
+        distances = np.abs(positions[:, None, :] - (positions[None, :, :] ))+ 1
+        unique_distances = distances[unique_idcs]
+
+        # Calculate areas of rectangles formed by each unique pair
+        areas = np.multiply(unique_distances[:, 0], unique_distances[:, 1])
+
+        return max(areas)
+
+    # Opposite corners of a rectangle are either lower-left/upper-right or upper-left/lower-right of each other.
+    # Replacing a corner by a position further out in both directions never shrinks the rectangle,
+    # hence only positions that are not surpassed towards their corner (the staircase chains) are candidates.
+    # The upper-left/lower-right case is the same as lower-left/upper-right with mirrored y-coordinates.
+    largest = 0
+    for mirrored in (positions, positions * np.array([1, -1])):
+        lower_left = staircase(mirrored, 1, 1)
+        upper_right = staircase(mirrored, -1, -1)[::-1]
+        largest = max(largest, max_rect_between(lower_left, upper_right))
+    return largest
+
+
+def staircase(positions: np.ndarray, sign_x: int, sign_y: int) -> np.ndarray:
+    """
+    Find all positions that are not surpassed by another position towards one corner.
+    The corner is given by the signs, e.g. (1, 1) -> lower-left: no other position has both a smaller (or equal) x and y.
+    
+    :param positions: array of 2D positions -> shape (num_positions, 2)
+    :type positions: np.ndarray
+    :param sign_x: 1 for the low x side, -1 for the high x side
+    :type sign_x: int
+    :param sign_y: 1 for the low y side, -1 for the high y side
+    :type sign_y: int
+    :return: positions of the staircase chain, sorted from the corner's x side to the opposite side -> shape (num_steps, 2)
+    :rtype: np.ndarray
+    """
+    x, y = sign_x * positions[:, 0], sign_y * positions[:, 1]
+    order = np.lexsort((y, x))
+    # Sorted by x, a position is part of the staircase if its y is below the y of all positions before it.
+    lowest_before = np.minimum.accumulate(y[order])
+    steps = np.append(True, y[order][1:] < lowest_before[:-1])
+    return positions[order[steps]]
 
-    return max(areas)
+
+def rect_areas(corners_a: np.ndarray, corners_b: np.ndarray) -> np.ndarray:
+    # Areas of the rectangles from corners_a (lower-left) to corners_b (upper-right).
+    # Pairs with corners_b below and left of corners_a are no valid rectangles, but their product is positive too. They are negated.
+    dx = corners_b[:, 0] - corners_a[:, 0] + 1
+    dy = corners_b[:, 1] - corners_a[:, 1] + 1
+    areas = dx * dy
+    return np.where((dx < 0) & (dy < 0), -areas, areas)
+
+
+def max_rect_between(lower_left: np.ndarray, upper_right: np.ndarray) -> int:
+    """
+    Largest rectangle between a lower-left and an upper-right staircase chain, both sorted by increasing x (hence decreasing y).
+    
+    The best upper-right partner never moves left if the lower-left corner moves right (monotone optimum),
+    so the partner of the middle corner splits the search into two halves (divide and conquer).
+    All sub-problems of a recursion level are evaluated at once, every level compares O(len(lower_left) + len(upper_right)) pairs.
+    
+    :param lower_left: lower-left staircase chain -> shape (num_a, 2)
+    :type lower_left: np.ndarray
+    :param upper_right: upper-right staircase chain -> shape (num_b, 2)
+    :type upper_right: np.ndarray
+    :return: largest area
+    :rtype: int
+    """
+    largest = 0
+    # Sub-problems: rows [row_low, row_high) of lower_left with partners in [col_low, col_high] of upper_right
+    row_low, row_high = np.array([0]), np.array([len(lower_left)])
+    col_low, col_high = np.array([0]), np.array([len(upper_right) - 1])
+    while len(row_low):
+        middle = (row_low + row_high) // 2
+        widths = col_high - col_low + 1
+        starts = np.cumsum(widths) - widths
+        cols = np.repeat(col_low - starts, widths) + np.arange(widths.sum())
+        areas = rect_areas(lower_left[np.repeat(middle, widths)], upper_right[cols])
+
+        # First best partner of every middle corner
+        best = np.maximum.reduceat(areas, starts)
+        largest = max(largest, int(best.max()))
+        first = np.where(areas == np.repeat(best, widths), np.arange(len(areas)), len(areas))
+        partner = cols[np.minimum.reduceat(first, starts)]
+
+        row_low, row_high = np.concatenate([row_low, middle + 1]), np.concatenate([middle, row_high])
+        col_low, col_high = np.concatenate([col_low, partner]), np.concatenate([partner, col_high])
+        remaining = row_low < row_high
+        row_low, row_high, col_low, col_high = row_low[remaining], row_high[remaining], col_low[remaining], col_high[remaining]
+    return largest
 
 
 def part1(filename: str):
     # Implementation for part 1
     # Data Loading + Processing
-    with open(filename, 'r') as file:
-        data = file.readlines()
-        data = np.array([line.strip().split(',') for line in data], dtype=int)
-        return find_largest_rect(data)
+    data = load_int_columns(filename)
+    return find_largest_rect(data)
 
 
 def rect_is_in_area(area: list[np.ndarray], area_offset: int, min_x: int, min_y: int, max_x: int, max_y: int) -> bool:
@@ -61,7 +156,93 @@ def rect_is_in_area(area: list[np.ndarray], area_offset: int, min_x: int, min_y:
     return True
 
 
-def find_largest_rect_restricted(positions: np.ndarray):
+def build_area_prefix(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rasterize the area circumscribed by the positions on a compressed grid and build a 2D prefix sum of all tiles outside of it.
+    
+    The compressed grid only contains the distinct x- and y-values of the positions (even indices) and the gaps between them (odd indices).
+    Every cell of this grid is either completely inside or completely outside of the area, hence it is enough to rasterize the cells.
+    Cells of the gap rows are inside, if an odd number of vertical lines lies left of them (ray casting). The remaining cells are inside,
+    if they are part of a line or if the gap row above them is inside (nothing can separate them from it).
+    
+    :param positions: array of 2D positions in order along the border of the area -> shape (num_positions, 2)
+    :type positions: np.ndarray
+    :return: distinct x-values, distinct y-values and the prefix sum of the outside cells -> shape (2 * num_y, 2 * num_x)
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    xs, ys = np.unique(positions[:, 0]), np.unique(positions[:, 1])
+    cols = 2 * np.searchsorted(xs, positions[:, 0])
+    rows = 2 * np.searchsorted(ys, positions[:, 1])
+
+    border = np.zeros((2 * len(ys) - 1, 2 * len(xs) - 1), dtype=bool)
+    crossings = np.zeros(border.shape, dtype=np.int8)
+    for idx in range(len(positions)):
+        row_0, row_1 = sorted((rows[idx - 1], rows[idx]))
+        col_0, col_1 = sorted((cols[idx - 1], cols[idx]))
+        border[row_0:row_1 + 1, col_0:col_1 + 1] = True
+        if col_0 == col_1:
+            crossings[row_0 + 1:row_1:2, col_0] = 1  # a vertical line crosses all gap rows between its ends
+
+    inside = border | (np.cumsum(crossings, axis=1) % 2 == 1)
+    inside[2::2] |= inside[1::2]
+
+    # Tiles outside of the area per cell. Gap cells between neighboring values (e.g. x=3 and x=4) contain no tiles.
+    widths = np.ones(border.shape[1], dtype=np.int64)
+    widths[1::2] = np.diff(xs) - 1
+    heights = np.ones(border.shape[0], dtype=np.int64)
+    heights[1::2] = np.diff(ys) - 1
+    outside = (~inside & (heights[:, None] > 0) & (widths[None, :] > 0)).astype(np.int32)
+
+    prefix = np.zeros((border.shape[0] + 1, border.shape[1] + 1), dtype=np.int32)
+    prefix[1:, 1:] = outside.cumsum(axis=0).cumsum(axis=1)
+    return xs, ys, prefix
+
+
+def rects_are_in_area(xs: np.ndarray, ys: np.ndarray, prefix: np.ndarray, min_x: np.ndarray, min_y: np.ndarray, max_x: np.ndarray, max_y: np.ndarray) -> np.ndarray:
+    """
+    Test if rectangles (min_x, min_y) to (max_x, max_y) are fully inside the area. All bounds have to be values of xs/ys.
+    Each test is a constant-time lookup of the outside cells within the rectangle in the prefix sum.
+    
+    :param xs: distinct x-values of the compressed grid
+    :type xs: np.ndarray
+    :param ys: distinct y-values of the compressed grid
+    :type ys: np.ndarray
+    :param prefix: prefix sum of the outside cells, see build_area_prefix
+    :type prefix: np.ndarray
+    :return: True for every rectangle inside of the area
+    :rtype: np.ndarray
+    """
+    col_0, col_1 = 2 * np.searchsorted(xs, min_x), 2 * np.searchsorted(xs, max_x) + 1
+    row_0, row_1 = 2 * np.searchsorted(ys, min_y), 2 * np.searchsorted(ys, max_y) + 1
+    return prefix[row_1, col_1] - prefix[row_0, col_1] - prefix[row_1, col_0] + prefix[row_0, col_0] == 0
+
+
+def find_largest_rect_restricted(positions: np.ndarray, engine: str = 'prefix', workers: int = 1, chunk_size: int = 5000):
+    """
+    Find the largest rectangle spanned by two positions, that is fully inside the area circumscribed by the positions.
+    
+    :param positions: array of 2D positions in order along the border of the area -> shape (num_positions, 2)
+    :type positions: np.ndarray
+    :param engine: 'prefix' tests all rectangles at once with a prefix sum on the compressed grid,
+        'columns' tests the rectangles one by one against the y-intervals of every x-column (slow)
+    :type engine: str
+    :param workers: number of processes searching the candidates of the 'columns' engine in parallel
+    :type workers: int
+    :param chunk_size: number of candidates per parallel task
+    :type chunk_size: int
+    """
+    if engine == 'prefix':
+        idx_0, idx_1 = np.triu_indices(len(positions), k=1)
+        corners_0, corners_1 = positions[idx_0], positions[idx_1]
+        min_corner, max_corner = np.minimum(corners_0, corners_1), np.maximum(corners_0, corners_1)
+        areas = np.prod(max_corner - min_corner + 1, axis=1)
+
+        xs, ys, prefix = build_area_prefix(positions)
+        valid = rects_are_in_area(xs, ys, prefix, min_corner[:, 0], min_corner[:, 1], max_corner[:, 0], max_corner[:, 1])
+        return np.max(areas[valid])
+    if engine != 'columns':
+        raise ValueError(f"Unknown engine '{engine}'.")
+
     # Find all unique pairs of positions similar to part 1
     unique_idcs = np.triu_indices(len(positions), k=1)
     distances = np.abs(positions[:, None, :] - (positions[None, :, :] ))+ 1
@@ -129,6 +310,12 @@ def find_largest_rect_restricted(positions: np.ndarray):
         
     marked_area = [np.array(m, dtype=int) for m in marked_area]
     sorted_area_idcs = np.argsort(areas)[::-1]
+    if workers > 1:
+        corners = np.sort(np.stack([positions[unique_idcs[0][sorted_area_idcs]], positions[unique_idcs[1][sorted_area_idcs]]]), axis=0)
+        bounds = np.concatenate([corners[0], corners[1]], axis=1)  # (min_x, min_y, max_x, max_y) per candidate
+        found = search_rects_parallel(marked_area, min_x, bounds, workers, chunk_size)
+        return areas[sorted_area_idcs[found]] if found >= 0 else None
+
     for idx in sorted_area_idcs:
         point_1 = positions[unique_idcs[0][ idx]]
         point_2 = positions[unique_idcs[1][ idx]]
@@ -141,13 +328,80 @@ def find_largest_rect_restricted(positions: np.ndarray):
             print(f"Checked {count} rectangles... Current area: {areas[idx]}")
 
 
+# Structures shared with the worker processes of search_rects_parallel. They are handed over once per process
+# through the pool initializer, never per task.
+_worker_state = {}
+
+
+def _init_search_worker(marked_area: list[np.ndarray], area_offset: int, best_chunk):
+    _worker_state.update(marked_area=marked_area, area_offset=area_offset, best_chunk=best_chunk)
+
+
+def _search_chunk(chunk_idx: int, bounds: np.ndarray) -> int:
+    # Index of the first rectangle inside the area within this chunk, -1 if there is none.
+    # The search is aborted, as soon as an earlier chunk already holds a valid rectangle.
+    best_chunk = _worker_state['best_chunk']
+    for idx, (min_x, min_y, max_x, max_y) in enumerate(bounds.tolist()):
+        if idx % 64 == 0 and best_chunk.value < chunk_idx:
+            return -1
+        if rect_is_in_area(_worker_state['marked_area'], _worker_state['area_offset'], min_x, min_y, max_x, max_y):
+            with best_chunk.get_lock():
+                best_chunk.value = min(best_chunk.value, chunk_idx)
+            return idx
+    return -1
+
+
+def search_rects_parallel(marked_area: list[np.ndarray], area_offset: int, bounds: np.ndarray, workers: int, chunk_size: int = 5000) -> int:
+    """
+    Find the first rectangle inside the area in a list of candidates, using multiple processes.
+    
+    The candidates are split into chunks that are searched independently. The result is the first valid rectangle of the first chunk
+    that holds one, hence it is confirmed once all chunks before it were searched without success. Workers stop early on chunks
+    behind the best chunk found so far, and the remaining chunks are cancelled once the result is confirmed.
+    
+    :param marked_area: y-intervals for each x-column, see rect_is_in_area
+    :type marked_area: list[np.ndarray]
+    :param area_offset: offset between area index and actual x-coordinate
+    :type area_offset: int
+    :param bounds: candidate rectangles (min_x, min_y, max_x, max_y) in order of priority -> shape (num_candidates, 4)
+    :type bounds: np.ndarray
+    :param workers: number of worker processes
+    :type workers: int
+    :param chunk_size: number of candidates per task
+    :type chunk_size: int
+    :return: index of the first valid candidate, -1 if there is none
+    :rtype: int
+    """
+    # Fork lets the workers inherit the area instead of receiving a pickled copy (not available on Windows).
+    # Tasks refer to _search_chunk by module name, hence the module has to be importable or registered in sys.modules
+    # (benchmark.load_solution does so), which forked workers inherit.
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    num_chunks = -(-len(bounds) // chunk_size)
+    best_chunk = context.Value('q', num_chunks)
+    results = {}
+    next_chunk = 0  # all chunks before it are searched without a valid rectangle
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_search_worker, initargs=(marked_area, area_offset, best_chunk)) as executor:
+        futures = {executor.submit(_search_chunk, chunk, bounds[chunk * chunk_size:(chunk + 1) * chunk_size]): chunk for chunk in range(num_chunks)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            while results.get(next_chunk, 0) < 0:
+                next_chunk += 1
+            if results.get(next_chunk, -1) >= 0:
+                # Pending chunks are cancelled, running ones stop at their next look at best_chunk. Leaving the executor waits for them,
+                # so no worker outlives the shared best_chunk.
+                for pending in futures:
+                    pending.cancel()
+                break
+    if results.get(next_chunk, -1) < 0:
+        return -1
+    return next_chunk * chunk_size + results[next_chunk]
+
+
 def part2(filename: str):
     # Implementation for part 2
     # Data Loading + Processing
-    with open(filename, 'r') as file:
-        data = file.readlines()
-        data = np.array([line.strip().split(',') for line in data], dtype=int)
-        return find_largest_rect_restricted(data)
+    data = load_int_columns(filename)
+    return find_largest_rect_restricted(data)
 
 
 if __name__ == "__main__":
@@ -155,8 +409,9 @@ if __name__ == "__main__":
     start_time = time.time()
     print(f"Part 1: {part1('./2025/day_09_input.txt')} -> t = {time.time() - start_time} seconds.")
 
-    print("Starting Part 2 Tests... \n Execution times may vary significantly based on input size. During my experiments the actual data took around 3 minutes to compute.")
+    # The 'columns' engine of find_largest_rect_restricted took around 3 minutes for the actual data, the default 'prefix' engine takes well below a second.
     assert part2('./2025/day_09_test.txt') == 24
+    assert find_largest_rect_restricted(load_int_columns('./2025/day_09_test.txt'), 'columns', workers=2, chunk_size=3) == 24
     """
     Self Generated Test Case: Target 45
     3,0
@@ -1,14 +1,25 @@
 import numpy as np
 import time
-from scipy.optimize import LinearConstraint, milp, Bounds
+import sys
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repository root for the shared modules
+from common import parse_ints
 
 
 def find_shortest_path(start: int, end: int, steps: list[int]) -> int:
     # Apply breadth-first search to find the shortest path to the target setting 'end'
-    queue = [(start, 0)]  # (current position, number of steps)
+    # Reference for find_min_toggles, the number of visited states grows with 2^(number of lights).
+    if start == end:
+        return 0
+    queue = deque([(start, 0)])  # (current position, number of steps)
     seen = set([start])
     while queue:
-        current, depth = queue.pop(0)
+        current, depth = queue.popleft()
 
         # Add all possible next steps to the end of the queue.
         for step in steps:
@@ -21,12 +32,60 @@ def find_shortest_path(start: int, end: int, steps: list[int]) -> int:
             # Skip already seen positions and add new ones to the back of the queue.
             if next_pos in seen:
                 continue
+            seen.add(next_pos)
             queue.append((next_pos, depth + 1))
 
     return  np.inf
 
 
-def part1(filename: str):
+def find_min_toggles(end: int, steps: list[int]) -> int:
+    """
+    Find the smallest number of button presses to toggle all lights from off to 'end'.
+    
+    Pressing a button twice cancels out, hence every button is pressed at most once and the presses form a linear system over GF(2):
+    the XOR of the chosen bitmasks has to equal 'end'. Gaussian elimination on the bitmasks yields one solution and a basis of
+    all button combinations that toggle nothing (null space). Every solution is the first one combined with a subset of this basis,
+    so only 2^nullity candidates are left to find the one with the fewest presses.
+    
+    :param end: target light configuration as bitmask
+    :type end: int
+    :param steps: bitmask of the lights toggled by each button
+    :type steps: list[int]
+    :return: smallest number of button presses, np.inf if the configuration cannot be reached
+    :rtype: int
+    """
+    # Reduced basis: pivot (highest light bit) -> (bitmask, pressed buttons as bitmask)
+    basis = {}
+    null_space = []
+    for button, step in enumerate(steps):
+        lights, pressed = reduce_toggles(basis, step, 1 << button)
+        if lights:
+            basis[lights.bit_length() - 1] = (lights, pressed)
+        else:
+            null_space.append(pressed)
+
+    lights, pressed = reduce_toggles(basis, end, 0)
+    if lights:
+        return np.inf
+
+    # Walk all subsets of the null space in Gray code order, each subset differs from the previous one by a single basis vector.
+    best = pressed.bit_count()
+    for idx in range(1, 1 << len(null_space)):
+        pressed ^= null_space[(idx & -idx).bit_length() - 1]
+        best = min(best, pressed.bit_count())
+    return best
+
+
+def reduce_toggles(basis: dict, lights: int, pressed: int) -> tuple[int, int]:
+    # Eliminate all pivots of the basis from the light bitmask, starting at the highest one. pressed tracks the buttons involved.
+    for pivot in sorted(basis, reverse=True):
+        if lights >> pivot & 1:
+            lights ^= basis[pivot][0]
+            pressed ^= basis[pivot][1]
+    return lights, pressed
+
+
+def part1(filename: str, use_bfs: bool = False):
     # Implementation for part 1
     # Find the smallest sequence of button presses to achieve the target light configuration for each iteration.
     with open(filename, 'r') as file:
@@ -51,10 +110,13 @@ def part1(filename: str):
             masks = []
             for s in switches[idx]:
                 step = np.array(s[1:-1].split(','), dtype=int)
-                masks.append(np.sum(np.pow(2, step)))
+                masks.append(int(np.sum(np.pow(2, step))))
 
             # Find and store the shortest sequence for this iteration
-            best_sequences.append(find_shortest_path(start, end, masks))
+            if use_bfs:
+                best_sequences.append(find_shortest_path(start, end, masks))
+            else:
+                best_sequences.append(find_min_toggles(end, masks))
 
     # Return the sum of all best sequences found
     return sum(best_sequences)
@@ -65,6 +127,9 @@ def find_min_presses(switch_matrix: np.ndarray, end: np.ndarray) -> np.ndarray:
     # As this is an ILP problem, we use scipy's milp solver to find the optimal solution in a reasonable time.
     # My initial manual approach using BFS was not efficient enough for larger inputs, hence it is replaced by MILP.
 
+    # scipy.optimize is only imported if the MILP solver is requested, as the import alone takes longer than most machines.
+    from scipy.optimize import LinearConstraint, milp, Bounds
+
     # Set parameters for MILP solver
     num_switches = switch_matrix.shape[1]
     bounds = Bounds(lb=np.zeros(num_switches), ub=np.full(num_switches, np.inf))
@@ -85,42 +150,286 @@ def find_min_presses(switch_matrix: np.ndarray, end: np.ndarray) -> np.ndarray:
     return np.rint(res.x).astype(int)
 
 
-def part2(filename: str):
-    # Implementation for part 2
-    # Find the minimal number of button presses to achieve the target joltage configuration for each iteration.
+def reduce_integer_rows(augmented: np.ndarray) -> tuple[np.ndarray, list[int]]:
+    """
+    Gaussian elimination of an augmented integer matrix [A | b] without fractions.
+    Rows are combined by cross-multiplication and divided by their greatest common divisor afterwards, so all entries stay small integers.
+    
+    :param augmented: integer matrix [A | b]
+    :type augmented: np.ndarray
+    :return: reduced rows (every pivot column is zero apart from its positive pivot) and the pivot column of each row
+    :rtype: tuple[np.ndarray, list[int]]
+    """
+    rows = augmented.astype(np.int64)
+    pivots = []
+    for col in range(rows.shape[1] - 1):
+        if len(pivots) == rows.shape[0]:
+            break
+        row = len(pivots)
+        candidates = np.flatnonzero(rows[row:, col])
+        if len(candidates) == 0:
+            continue
+        rows[[row, row + candidates[0]]] = rows[[row + candidates[0], row]]
+        rows[row] *= np.sign(rows[row, col])
+
+        # Eliminate the column from all other rows at once
+        factors = rows[:, col].copy()
+        factors[row] = 0
+        rows = rows * np.where(factors != 0, rows[row, col], 1)[:, None] - factors[:, None] * rows[row]
+        rows //= np.maximum(np.gcd.reduce(rows, axis=1), 1)[:, None]
+        pivots.append(col)
+
+    if np.any(rows[len(pivots):, -1]):
+        raise RuntimeError("The target joltages cannot be reached.")
+    return rows[:len(pivots)], pivots
+
+
+def find_relaxed_basis(rows: np.ndarray, rhs: np.ndarray) -> list[int] | None:
+    """
+    Find an optimal basis of the relaxed problem, where presses may be fractional: minimize sum(x) with rows @ x = rhs and x >= 0.
+    Solved with the simplex method on a dense tableau, first for any feasible basis (artificial variables), then for the fewest presses.
+    Bland's rule (lowest column enters, lowest basic column leaves) prevents cycling on degenerate systems.
+    
+    :param rows: integer rows, e.g. the switch matrix
+    :type rows: np.ndarray
+    :param rhs: right hand side of the rows
+    :type rhs: np.ndarray
+    :return: columns of an optimal basis, one per independent row. None if not even fractional presses reach the targets
+    :rtype: list[int] | None
+    """
+    num_rows, num_cols = rows.shape
+    sign = np.where(rhs < 0, -1, 1)
+    table = np.zeros((num_rows + 1, num_cols + num_rows + 1))
+    table[:num_rows, :num_cols] = rows * sign[:, None]
+    table[:num_rows, num_cols:-1] = np.eye(num_rows)
+    table[:num_rows, -1] = rhs * sign
+    basis = list(range(num_cols, num_cols + num_rows))
+
+    def pivot(row: int, col: int):
+        table[row] /= table[row, col]
+        others = np.arange(num_rows + 1) != row
+        table[others] -= table[others, col][:, None] * table[row]
+        basis[row] = col
+
+    def optimize(num_candidates: int):
+        # The last row holds the reduced costs, a negative one improves the objective
+        while True:
+            entering = np.flatnonzero(table[-1, :num_candidates] < -1e-9)
+            if len(entering) == 0:
+                return
+            column = table[:num_rows, entering[0]]
+            candidates = np.flatnonzero(column > 1e-9)
+            ratios = table[candidates, -1] / column[candidates]
+            leaving = candidates[ratios <= ratios.min() + 1e-9]
+            pivot(min(leaving, key=lambda row: basis[row]), entering[0])
+
+    # Phase 1: minimize the sum of the artificial variables
+    table[-1, :num_cols] = -table[:num_rows, :num_cols].sum(axis=0)
+    table[-1, -1] = -table[:num_rows, -1].sum()
+    optimize(num_cols + num_rows)
+    if table[-1, -1] < -1e-6:
+        return None
+    # Artificial variables left in the basis are zero. Each is swapped for a switch, unless its row is redundant (all zero).
+    for row in range(num_rows):
+        candidates = np.flatnonzero(np.abs(table[row, :num_cols]) > 1e-9)
+        if basis[row] >= num_cols and len(candidates) > 0:
+            pivot(row, candidates[0])
+    redundant = [row for row in range(num_rows) if basis[row] >= num_cols]
+    table = np.delete(table, redundant, axis=0)
+    basis = [col for col in basis if col < num_cols]
+    num_rows = len(basis)
+
+    # Phase 2: minimize the number of presses, every switch costs 1
+    table[-1] = 0
+    table[-1, :num_cols] = 1 - table[:num_rows, :num_cols].sum(axis=0)
+    table[-1, -1] = -table[:num_rows, -1].sum()
+    optimize(num_cols)
+    return basis
+
+
+def solve_min_presses(switch_matrix: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    Find the minimal number of button presses for a 0/1 switch matrix without a general ILP solver.
+    
+    The switches of an optimal basis of the relaxed problem (find_relaxed_basis) become the pivots of the integer elimination, then
+    every pivot switch is determined by the free switches: pivot * x_pivot = rhs - M @ x_free. With this choice the total number of
+    presses is the relaxed optimum plus a non-negative cost per press of each free switch, so the search starts at the relaxed optimum.
+    The free switches are searched depth-first, the most expensive switch first and each from 0 presses upwards. The range of a switch is
+    narrowed by all pivot switches, which have to stay between 0 and the smallest target of their meters for any value of the remaining
+    free switches, and by the best total found so far. A branch is dropped as soon as a pivot row can no longer become divisible by its
+    pivot. The search stops once a solution reaches the rounded up relaxed optimum. The last free switch is evaluated for all values at once.
+    
+    :param switch_matrix: 0/1 matrix, rows -> joltage meters; columns -> switches
+    :type switch_matrix: np.ndarray
+    :param end: target joltages
+    :type end: np.ndarray
+    :return: number of presses per switch
+    :rtype: np.ndarray
+    """
+    basis = find_relaxed_basis(switch_matrix, end)
+    if basis is None:
+        raise RuntimeError("The target joltages cannot be reached.")
+
+    # Eliminate again with the switches of the basis in front, they become the pivots
+    order = basis + [col for col in range(switch_matrix.shape[1]) if col not in basis]
+    rows, pivots = reduce_integer_rows(np.column_stack([switch_matrix[:, order], end]))
+    free = [col for col in range(len(order)) if col not in pivots]
+    pivot_values, rhs = rows[np.arange(len(pivots)), pivots], rows[:, -1]
+
+    # A switch is never pressed more often than the smallest target of its meters
+    limits = np.array([min(end[switch_matrix[:, col] > 0], default=0) for col in order], dtype=np.int64)
+    pivot_limits, limits = limits[pivots], limits[free]
+    # A press of a free switch changes the total by 1 minus the presses it saves on the pivot switches
+    coefficients = rows[:, free]
+    costs = 1 - np.sum(coefficients / pivot_values[:, None], axis=0)
+
+    # The most expensive free switches first, their range is narrowed the most by the best total
+    search_order = np.lexsort((limits, -costs))
+    free, limits, costs, coefficients = [free[k] for k in search_order], limits[search_order], costs[search_order], coefficients[:, search_order]
+    # Range of the contribution of all free switches from level k on to every pivot row, and their lowest change of the total
+    lowest_rest = np.cumsum(np.minimum(coefficients * limits, 0)[:, ::-1], axis=1)[:, ::-1]
+    lowest_rest = np.column_stack([lowest_rest, np.zeros(len(rhs), dtype=np.int64)])
+    highest_rest = np.cumsum(np.maximum(coefficients * limits, 0)[:, ::-1], axis=1)[:, ::-1]
+    highest_rest = np.column_stack([highest_rest, np.zeros(len(rhs), dtype=np.int64)])
+    lowest_cost = np.append(np.cumsum(np.minimum(costs * limits, 0)[::-1])[::-1], 0)
+    # The free switches from level k on change a pivot row only by multiples of the gcd of their coefficients (and the pivot)
+    gcds = np.gcd.accumulate(np.column_stack([pivot_values, coefficients[:, ::-1]]), axis=1)[:, ::-1]
+    relaxed = np.sum(rhs / pivot_values)
+    lowest_total = np.ceil(relaxed + lowest_cost[0] - 1e-6)
+
+    best_total, best_presses = np.inf, None
+
+    def search(pivot_sums: np.ndarray, cost: float, assigned: list[int]):
+        # pivot_sums: contribution of the assigned free switches to every pivot row; cost: total of the relaxed problem so far
+        nonlocal best_total, best_presses
+        level = len(assigned)
+        # Totals are integers, a branch has to be able to save at least one press
+        if best_total <= lowest_total or cost + lowest_cost[level] > best_total - 1 + 1e-6:
+            return
+        if np.any((rhs - pivot_sums) % gcds[:, level]):
+            return
+        if level == len(free):
+            best_total, best_presses = int(np.sum((rhs - pivot_sums) // pivot_values)), assigned
+            return
+
+        # Every pivot switch has to stay within [0, limit]: column * x <= upper and column * x >= lower
+        column = coefficients[:, level]
+        upper = rhs - pivot_sums - lowest_rest[:, level + 1]
+        lower = rhs - pivot_sums - highest_rest[:, level + 1] - pivot_values * pivot_limits
+        positive, negative = column > 0, column < 0
+        high = min(limits[level], np.min(upper[positive] // column[positive], initial=limits[level]),
+                   np.min(lower[negative] // column[negative], initial=limits[level]))
+        low = max(0, np.max(-(-lower[positive] // column[positive]), initial=0), np.max(-(-upper[negative] // column[negative]), initial=0))
+        if costs[level] > 1e-9 and best_total < np.inf:
+            high = min(high, int(np.floor((best_total - 1 - cost - lowest_cost[level + 1]) / costs[level] + 1e-6)))
+        if low > high:
+            return
+
+        if level == len(free) - 1:
+            # All values of the last free switch at once, the range already keeps every pivot switch non-negative
+            presses = np.arange(low, high + 1)
+            numerators = rhs - pivot_sums - presses[:, None] * column
+            valid = np.all(numerators % pivot_values == 0, axis=1)
+            if valid.any():
+                totals = np.sum(numerators[valid] // pivot_values, axis=1) + presses[valid] + sum(assigned)
+                idx = np.argmin(totals)
+                if totals[idx] < best_total:
+                    best_total, best_presses = int(totals[idx]), assigned + [int(presses[valid][idx])]
+            return
+        for presses in range(low, high + 1):
+            if best_total <= lowest_total or (costs[level] >= 0 and cost + costs[level] * presses + lowest_cost[level + 1] > best_total - 1 + 1e-6):
+                break
+            search(pivot_sums + presses * column, cost + costs[level] * presses, assigned + [presses])
+
+    search(np.zeros(len(rhs), dtype=np.int64), relaxed, [])
+    if best_presses is None:
+        raise RuntimeError("The target joltages cannot be reached.")
+
+    presses = np.zeros(len(order), dtype=np.int64)
+    presses[free] = best_presses
+    presses[pivots] = (rhs - coefficients @ presses[free]) // pivot_values
+    solution = np.zeros(len(order), dtype=np.int64)
+    solution[order] = presses
+    return solution
+
+
+def load_machines(filename: str) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Load the switch matrix and the target joltages of all machines.
+    
+    :param filename: name of the input file
+    :type filename: str
+    :return: per machine the switch matrix (rows -> joltage meters; columns -> switches) and the target joltages
+    :rtype: list[tuple[np.ndarray, np.ndarray]]
+    """
+    machines = []
     with open(filename, 'r') as file:
-        
-        # Load data and split it into lights, switches and joltages
-        data = [line.strip().split() for line in file.readlines()]
-        lights = []
-        switches = []
-        joltages = []
-        for line in data:
-            lights.append(line[0])
-            switches.append(line[1:-1])
-            joltages.append(line[-1])
+        for line in file:
+            if not line.strip():
+                continue
+            buttons = line[line.index(']') + 1:line.index('{')].split()
+            end = parse_ints(line[line.index('{'):])
+
+            # All indices of all buttons at once, each button covers (number of commas + 1) meters
+            meters = parse_ints(' '.join(buttons))
+            counts = [b.count(',') + 1 for b in buttons]
+            switch_matrix = np.zeros((len(end), len(buttons)), dtype=np.uint8)
+            switch_matrix[meters, np.repeat(np.arange(len(buttons)), counts)] = 1
+            machines.append((switch_matrix, end))
+    return machines
 
-        # Find the smallest sequence of button presses for each iteration
-        num_button_presses = []
-        for iteration in range(len(lights)):
-            num_switches = len(switches[iteration])
-            num_lights = len(lights[iteration]) - 2   # inside [...] pattern
 
-            # All buttons can be modeled in a matrix to solve the linear problem Ax=b.
-            # As we are interested in a integer solution, this results in an Integer Linear Programming (ILP) problem.
+def canonical_machine(switch_matrix: np.ndarray, end: np.ndarray) -> bytes:
+    # The order of the switches does not change the minimal number of presses, hence machines with permuted columns share a key.
+    columns = sorted(column.tobytes() for column in switch_matrix.T)
+    return b'|'.join([np.int64(switch_matrix.shape[0]).tobytes(), end.astype(np.int64).tobytes(), *columns])
 
-            # Create the switch matrix
-            # rows -> joltage meters; columns -> switches
-            switch_matrix = np.zeros((num_lights, num_switches), dtype=int)
-            for b, s in enumerate(switches[iteration]):
-                idxs = np.fromstring(s[1:-1], sep=",", dtype=int)
-                switch_matrix[idxs, b] = 1
-            end = np.array(joltages[iteration][1:-1].split(','), dtype=int)   
 
-            # Find the smallest sequence and store its length
-            num_button_presses.append(np.sum(find_min_presses(switch_matrix, end)))
+def count_min_presses(machine: tuple[np.ndarray, np.ndarray], use_milp: bool = False) -> int:
+    # Total number of button presses of a single machine, the MILP solver serves as reference.
+    presses = find_min_presses(*machine) if use_milp else solve_min_presses(*machine)
+    return int(np.sum(presses))
 
-        return sum(num_button_presses)
+
+def count_min_presses_batch(machines: list[tuple[np.ndarray, np.ndarray]], workers: int = 1, use_milp: bool = False) -> list[int]:
+    """
+    Find the minimal number of button presses for many machines.
+    Machines that are identical up to the order of their switches are solved once. The remaining problems are independent
+    and are distributed over a process pool if multiple workers are requested.
+    
+    :param machines: switch matrix and target joltages of each machine, see load_machines
+    :type machines: list[tuple[np.ndarray, np.ndarray]]
+    :param workers: number of processes, 1 solves all machines in this process
+    :type workers: int
+    :param use_milp: solve every machine with the MILP solver instead of solve_min_presses
+    :type use_milp: bool
+    :return: minimal number of button presses per machine
+    :rtype: list[int]
+    """
+    keys = [canonical_machine(*machine) for machine in machines]
+    unique = {}
+    for key, machine in zip(keys, machines):
+        unique.setdefault(key, machine)
+
+    solve = partial(count_min_presses, use_milp=use_milp)
+    if workers > 1:
+        # The solver is pickled by module name, forked workers inherit the module even if it was loaded from its path (benchmark.py).
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        with ProcessPoolExecutor(workers, mp_context=context) as executor:
+            solutions = list(executor.map(solve, unique.values(), chunksize=max(1, len(unique) // (4 * workers))))
+    else:
+        solutions = [solve(machine) for machine in unique.values()]
+    solutions = dict(zip(unique, solutions))
+    return [solutions[key] for key in keys]
+
+
+def part2(filename: str, workers: int = 1, use_milp: bool = False):
+    # Implementation for part 2
+    # Find the minimal number of button presses to achieve the target joltage configuration for each iteration.
+    # All buttons can be modeled in a matrix to solve the linear problem Ax=b.
+    # As we are interested in a integer solution, this results in an Integer Linear Programming (ILP) problem.
+    machines = load_machines(filename)
+    return sum(count_min_presses_batch(machines, workers, use_milp))
 
 
 if __name__ == "__main__":
@@ -132,5 +441,10 @@ if __name__ == "__main__":
     # [#.#####] (2,3,4,6) (2,5) (1,3,4,5,6) (1,2,5,6) (0,5,6) (0,1,2,3,4,6) (1,2,3,5,6) (1,3,4,6) (0,2,3,4,5,6) {23,42,62,53,35,62,74}
     # Expected return: 74
     assert part2('./2025/day_10_test.txt') == 33
+    assert part2('./2025/day_10_test.txt', use_milp=True) == 33
+    assert part2('./2025/day_10_test.txt', workers=2) == 33
+    # The dedicated solver has to agree with the MILP reference on every machine of the input
+    machines = load_machines('./2025/day_10_input.txt')
+    assert count_min_presses_batch(machines) == count_min_presses_batch(machines, use_milp=True)
     start_time = time.time()
     print(f"Part 2: {part2('./2025/day_10_input.txt')} -> t = {time.time() - start_time} seconds.")
\ No newline at end of file
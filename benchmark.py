@@ -0,0 +1,231 @@
+import argparse
+import contextlib
+import importlib.util
+import inspect
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+'''
+Benchmark runner for all solutions of the repository.
+
+    Every solution file in the year directories is loaded as a module and searched for entry points.
+    An entry point is a function defined in the solution file whose first parameter is "filename" (part1, part2, remove_boxes, ...).
+    Loaders (load_*) are skipped.
+    Each entry point is called with warmup runs first and is then timed for a number of repeats using time.perf_counter_ns.
+    Only the call itself is measured: module imports happen once up front and any prints of the entry point are swallowed.
+
+Usage:
+
+    python benchmark.py                              -> all solutions on their "_input" files
+    python benchmark.py --year 2025 --day 05         -> restrict to a single year / day
+    python benchmark.py --data test --repeat 50      -> run on the "_test" files with 50 timed repeats
+    python benchmark.py --json bench.json            -> additionally write the results as JSON ("-" for stdout)
+'''
+
+
+ROOT = Path(__file__).resolve().parent
+
+# Entry points that need additional arguments besides the filename.
+# Every entry maps a variant label to the extra arguments, either as a tuple or as a dict per data set ("test" / "input").
+# Entry points that are not listed here are called with their default arguments only.
+# Names shared by many solutions (part1, part2) are qualified by their solution file, e.g. "2025/day_10.py:part2".
+VARIANTS = {
+    'sum_invalid_ids_from_file': {'part1': (True,), 'part2': ()},
+    'remove_boxes': {'part1': (1,), 'part2': (), 'part2_convolution': (-1, False)},
+    'get_joltages_from_file': {'part1': (2,), 'part2': (12,)},
+    'remove_boxes_packed': {'part1': (1,), 'part2': ()},
+    'scan_memory': {'part1': (False,), 'part2': (True,)},
+    'connect_junctions_from_file': {'part1': {'test': (10,), 'input': (1000,)}, 'part2': ()},
+    # Dedicated solver against the MILP reference
+    '2025/day_10.py:part2': {'elimination': (), 'milp': (1, True)},
+}
+
+
+def find_solution_files(years: list[str] | None = None, days: list[str] | None = None) -> list[Path]:
+    '''
+    Find all solution files of the repository. Templates (XX) are skipped.
+
+    :param years: year directories to include, all if None
+    :type years: list[str] | None
+    :param days: zero-padded day numbers to include, all if None
+    :type days: list[str] | None
+    :return: sorted list of solution files
+    :rtype: list[Path]
+    '''
+    files = []
+    for year_dir in sorted(ROOT.glob('[0-9][0-9][0-9][0-9]')):
+        if years is not None and year_dir.name not in years:
+            continue
+        for file in sorted(year_dir.glob('*.py')):
+            day = re.search(r'(\d{2})$', file.stem)
+            if day is None:
+                continue  # template files like XX.py / day_XX.py
+            if days is not None and day.group(1) not in days:
+                continue
+            files.append(file)
+    return files
+
+
+def load_solution(file: Path):
+    # Solution files are not importable by name (e.g. "01.py"), hence they are loaded from their location.
+    # The year directory is added to the path, so that solutions can import their neighbouring modules like a script would.
+    # The module is registered under its name, so that its functions can be pickled for process pools (day_09, day_10).
+    name = f"aoc_{file.parent.name}_{file.stem}"
+    spec = importlib.util.spec_from_file_location(name, file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    sys.path.insert(0, str(file.parent))
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    finally:
+        sys.path.remove(str(file.parent))
+    return module
+
+
+def find_entry_points(module) -> list[tuple[str, callable]]:
+    # All functions defined in the solution itself whose first parameter is the input filename.
+    # Loaders (load_*) take the filename as well, but only prepare the data for the actual solvers.
+    entry_points = []
+    for name, func in inspect.getmembers(module, inspect.isfunction):
+        if func.__module__ != module.__name__ or name.startswith(('_', 'load_')):
+            continue
+        params = list(inspect.signature(func).parameters.values())
+        if not params or params[0].name != 'filename':
+            continue
+        if any(p.default is inspect.Parameter.empty for p in params[1:]) and name not in VARIANTS:
+            continue
+        entry_points.append((name, func))
+    return entry_points
+
+
+def time_call(func, args: tuple, warmup: int, repeat: int) -> tuple[np.ndarray, object]:
+    '''
+    Time a single entry point.
+
+    :param func: entry point to call
+    :param args: arguments of the call (filename first)
+    :type args: tuple
+    :param warmup: number of untimed calls before the measurement
+    :type warmup: int
+    :param repeat: number of timed calls
+    :type repeat: int
+    :return: timings of all repeats in nanoseconds and the result of the last call
+    :rtype: tuple[np.ndarray, object]
+    '''
+    timings = np.zeros(repeat, dtype=np.int64)
+    result = None
+    # Some entry points print their results, which should neither spam the output nor be part of the comparison.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func(*args)
+        for i in range(repeat):
+            start = time.perf_counter_ns()
+            result = func(*args)
+            timings[i] = time.perf_counter_ns() - start
+    return timings, result
+
+
+def summarize_result(result) -> str:
+    # Results are reported to spot wrong answers while optimizing. They are kept on one line:
+    # long arrays and lists (e.g. all joltages) are summed up, tuples are summarized element by element.
+    if isinstance(result, np.generic):
+        return str(result.item())
+    if isinstance(result, np.ndarray):
+        if result.size <= 3:
+            return str(result.tolist())
+        if np.issubdtype(result.dtype, np.number):
+            return f"ndarray{result.shape} sum={np.sum(result)}"
+        return f"ndarray{result.shape}"
+    if isinstance(result, tuple):
+        return '(' + ', '.join(summarize_result(r) for r in result) + ')'
+    if isinstance(result, list):
+        if len(result) > 3 and all(isinstance(r, (int, float, np.number)) for r in result):
+            return f"sum={np.sum(result)}"
+        if len(result) > 3:
+            return f"list(len={len(result)})"
+        return '[' + ', '.join(summarize_result(r) for r in result) + ']'
+    return str(result).replace('\n', ' ')
+
+
+def run_benchmarks(files: list[Path], data: str = 'input', warmup: int = 2, repeat: int = 10) -> list[dict]:
+    records = []
+    for file in files:
+        input_file = file.parent / f"{file.stem}_{data}.txt"
+        if not input_file.exists():
+            print(f"Skipping {file.relative_to(ROOT)}: {input_file.name} not found.", file=sys.stderr)
+            continue
+        module = load_solution(file)
+        for name, func in find_entry_points(module):
+            variants = VARIANTS.get(f"{file.parent.name}/{file.name}:{name}", VARIANTS.get(name, {'default': ()}))
+            for variant, extra_args in variants.items():
+                if isinstance(extra_args, dict):
+                    extra_args = extra_args[data]
+                timings, result = time_call(func, (str(input_file), *extra_args), warmup, repeat)
+                records.append({
+                    'year': file.parent.name,
+                    'file': file.name,
+                    'entry_point': name,
+                    'variant': variant,
+                    'data': data,
+                    'warmup': warmup,
+                    'repeat': repeat,
+                    'min_ns': int(np.min(timings)),
+                    'median_ns': int(np.median(timings)),
+                    'p95_ns': int(np.percentile(timings, 95)),
+                    'result': summarize_result(result),
+                })
+    return records
+
+
+def format_table(records: list[dict]) -> str:
+    header = ('solution', 'entry point', 'variant', 'min [ms]', 'median [ms]', 'p95 [ms]', 'result')
+    rows = [(
+        f"{r['year']}/{r['file']}",
+        r['entry_point'],
+        r['variant'],
+        f"{r['min_ns'] / 1e6:.3f}",
+        f"{r['median_ns'] / 1e6:.3f}",
+        f"{r['p95_ns'] / 1e6:.3f}",
+        r['result'],
+    ) for r in records]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = [' | '.join(cell.ljust(w) for cell, w in zip(header, widths))]
+    lines.append('-+-'.join('-' * w for w in widths))
+    lines += [' | '.join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows]
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark all Advent of Code solutions.")
+    parser.add_argument('--year', nargs='*', help="year directories to benchmark, e.g. 2025")
+    parser.add_argument('--day', nargs='*', help="zero-padded days to benchmark, e.g. 05")
+    parser.add_argument('--data', choices=('test', 'input'), default='input', help="data set to run on")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed calls per entry point")
+    parser.add_argument('--repeat', type=int, default=10, help="timed calls per entry point")
+    parser.add_argument('--json', metavar='PATH', help="write the results as JSON to PATH, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    files = find_solution_files(args.year, args.day)
+    records = run_benchmarks(files, args.data, args.warmup, args.repeat)
+
+    if args.json == '-':
+        print(json.dumps(records, indent=2))
+        return
+    print(format_table(records))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(records, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
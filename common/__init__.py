@@ -0,0 +1,7 @@
+from .loader import load_char_grid, load_int_columns, load_int_rows, parse_int_rows, parse_ints
+from .bit_grid import count_bits, fewer_neighbors_than, load_bit_grid
+from .disjoint_set import DisjointSet
+from .kd_tree import KDTree
+from .grid_search import count_templates, count_words
+
+__all__ = ['DisjointSet', 'KDTree', 'count_bits', 'count_templates', 'count_words', 'fewer_neighbors_than', 'load_bit_grid', 'load_char_grid', 'load_int_columns', 'load_int_rows', 'parse_int_rows', 'parse_ints']
@@ -0,0 +1,142 @@
+import mmap
+
+import numpy as np
+
+
+'''
+Bit-packed boolean grids for very large maps.
+
+    Every row is packed into uint64 words with one bit per cell. The first column of a word is its most significant bit,
+    hence shifting a row by one column is a shift by one bit plus the carry from the neighboring word.
+    Bits behind the last column are always zero.
+
+    Neighbor counts are computed bit-sliced: every bit position of a word holds one cell, and the count of each cell is
+    stored in four bit planes (1, 2, 4, 8) that are added with bitwise half adders. A whole word (64 cells) is processed per operation.
+'''
+
+
+WORD_BITS = 64
+
+
+def pack_rows(rows: np.ndarray) -> np.ndarray:
+    '''
+    Pack a boolean 2D array into uint64 words.
+
+    :param rows: boolean grid
+    :type rows: np.ndarray
+    :return: packed rows
+    :rtype: ndarray[(num_rows, ceil(num_cols / 64)), uint64]
+    '''
+    num_words = -(-rows.shape[1] // WORD_BITS)
+    packed = np.zeros((rows.shape[0], num_words * 8), dtype=np.uint8)
+    packed[:, :-(-rows.shape[1] // 8)] = np.packbits(rows, axis=1)
+    return packed.view('>u8').astype(np.uint64)
+
+
+def unpack_rows(words: np.ndarray, width: int) -> np.ndarray:
+    # Inverse of pack_rows
+    return np.unpackbits(words.astype('>u8').view(np.uint8), axis=1, count=width).astype(bool)
+
+
+def load_bit_grid(filename: str, char: str, block_rows: int = 4096) -> tuple[np.ndarray, int]:
+    '''
+    Load a character grid as bit-packed grid, cells equal to char are set.
+    The file is memory-mapped and packed in blocks of rows, so the unpacked grid never exists in memory.
+
+    :param filename: name of the input file
+    :type filename: str
+    :param char: character of the set cells
+    :type char: str
+    :param block_rows: number of rows packed at once
+    :type block_rows: int
+    :return: packed rows and the number of columns
+    :rtype: tuple[ndarray[(num_rows, num_words), uint64], int]
+    '''
+    with open(filename, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return np.zeros((0, 0), dtype=np.uint64), 0
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            width = memory.find(b'\n')
+            width = len(memory) if width < 0 else width
+            num_rows = -(-len(memory) // (width + 1))
+            words = np.zeros((num_rows, -(-width // WORD_BITS)), dtype=np.uint64)
+            for start in range(0, num_rows, block_rows):
+                end = min(start + block_rows, num_rows)
+                # The last line might miss its line break, hence it is not part of the reshaped view
+                count = min(end * (width + 1), len(memory)) - start * (width + 1)
+                chars = np.frombuffer(memory, dtype=np.uint8, count=count, offset=start * (width + 1))
+                chars = np.pad(chars, (0, (end - start) * (width + 1) - count)).reshape(-1, width + 1)
+                words[start:end] = pack_rows(chars[:, :width] == ord(char))
+                del chars  # release the view before the memory map is closed
+    return words, width
+
+
+_bit_counts = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def count_bits(words: np.ndarray) -> int:
+    # Number of set cells. NumPy < 2.0 has no bitwise_count, here a lookup table over the bytes is used.
+    if hasattr(np, 'bitwise_count'):
+        return int(np.sum(np.bitwise_count(words), dtype=np.int64))
+    return int(np.sum(_bit_counts[words.view(np.uint8)], dtype=np.int64))
+
+
+def fewer_neighbors_than(words: np.ndarray, threshold: int, block_rows: int = 4096) -> np.ndarray:
+    '''
+    Find all cells with less than threshold set cells among their eight neighbors.
+
+    :param words: packed rows, see load_bit_grid
+    :type words: np.ndarray
+    :param threshold: neighbor count limit (exclusive)
+    :type threshold: int
+    :param block_rows: number of rows processed at once, bounds the size of the temporary planes
+    :type block_rows: int
+    :return: packed rows, bits are set for cells with fewer neighbors (including empty cells and the padding bits)
+    :rtype: ndarray[(num_rows, num_words), uint64]
+    '''
+    num_rows, num_words = words.shape
+    result = np.zeros_like(words)
+    empty_row = np.zeros((1, num_words), dtype=np.uint64)
+    for start in range(0, num_rows, block_rows):
+        end = min(start + block_rows, num_rows)
+        # Rows above and below of the block are views, only the first and last block need an empty row outside the grid
+        center = words[start:end]
+        up = words[start - 1:end - 1] if start > 0 else np.vstack([empty_row, words[:end - 1]])
+        down = words[start + 1:end + 1] if end < num_rows else np.vstack([words[start + 1:end], empty_row])
+
+        # Bit-sliced counter with the planes 1, 2, 4, 8 over all eight neighbor planes
+        counter = [np.zeros_like(center) for _ in range(4)]
+        for rows in (up, center, down):
+            planes = (_shift_from_left(rows), _shift_from_right(rows)) if rows is center else (rows, _shift_from_left(rows), _shift_from_right(rows))
+            for plane in planes:
+                carry = plane
+                for bit in counter:
+                    carry, bit[...] = bit & carry, bit ^ carry
+
+        # Bit-sliced comparison counter < threshold, starting at the most significant bit
+        less = np.zeros_like(center)
+        equal = np.full_like(center, np.iinfo(np.uint64).max)
+        for i in reversed(range(4)):
+            if threshold >> i & 1:
+                less |= equal & ~counter[i]
+                equal &= counter[i]
+            else:
+                equal &= ~counter[i]
+        if threshold >= 16:
+            less[...] = np.iinfo(np.uint64).max
+        result[start:end] = less
+    return result
+
+
+def _shift_from_left(rows: np.ndarray) -> np.ndarray:
+    # Every cell gets the value of its left neighbor
+    shifted = rows >> np.uint64(1)
+    shifted[:, 1:] |= rows[:, :-1] << np.uint64(WORD_BITS - 1)
+    return shifted
+
+
+def _shift_from_right(rows: np.ndarray) -> np.ndarray:
+    # Every cell gets the value of its right neighbor
+    shifted = rows << np.uint64(1)
+    shifted[:, :-1] |= rows[:, 1:] >> np.uint64(WORD_BITS - 1)
+    return shifted
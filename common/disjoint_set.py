@@ -0,0 +1,67 @@
+import numpy as np
+
+
+'''
+Disjoint sets (union-find) stored in flat int32 arrays.
+
+    Every element points to a parent, the roots represent the sets. find compresses the visited path (path halving),
+    union attaches the smaller set below the larger one (union by size) -> nearly constant amortized time per operation.
+    The number of sets is updated on every successful union. The sizes of the largest sets are only determined on request,
+    with a partial sort over the sizes of all roots.
+'''
+
+
+class DisjointSet:
+    def __init__(self, num_elements: int):
+        '''
+        Create num_elements sets with a single element each.
+
+        :param num_elements: number of elements
+        :type num_elements: int
+        '''
+        self.parent = np.arange(num_elements, dtype=np.int32)
+        self.size = np.ones(num_elements, dtype=np.int32)
+        self.count = num_elements
+
+    def find(self, element: int) -> int:
+        # Root of the set of element. Every visited element is linked to its grandparent (path halving).
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return int(element)
+
+    def union(self, a: int, b: int) -> bool:
+        '''
+        Merge the sets of two elements.
+
+        :param a: first element
+        :type a: int
+        :param b: second element
+        :type b: int
+        :return: True if two sets were merged, False if both elements were already in the same set
+        :rtype: bool
+        '''
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.count -= 1
+        return True
+
+    def largest_sizes(self, k: int) -> list[int]:
+        '''
+        Sizes of the k largest sets.
+
+        :param k: number of sets
+        :type k: int
+        :return: sizes in descending order (less than k if there are fewer sets)
+        :rtype: list[int]
+        '''
+        sizes = self.size[self.parent == np.arange(len(self.parent))]
+        if k < len(sizes):
+            sizes = np.partition(sizes, len(sizes) - k)[len(sizes) - k:]
+        return sorted(sizes.tolist(), reverse=True)
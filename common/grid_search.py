@@ -0,0 +1,145 @@
+import numpy as np
+
+
+'''
+Pattern search over character grids.
+
+    Words and 2D templates are converted into patterns, i.e. lists of cells (row offset, column offset, character).
+    A pattern matches at a start cell if every cell of the pattern holds its character and its extent lies inside the grid.
+    The extent of a word ends at its last character, the extent of a template is its full box including wildcard cells.
+
+    All patterns are inserted into a trie of cells, so patterns that share their first cells (e.g. words with a common
+    prefix in the same direction) are only checked once for these cells. The search starts from the positions of the
+    first character, which are grouped for all characters with one pass over the grid. Deeper levels only keep the
+    start positions that still match, so the work per level shrinks with the number of remaining candidates.
+'''
+
+
+# (row step, column step) of all eight reading directions
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1))
+
+
+def count_words(grid: np.ndarray, words: list[str], directions=DIRECTIONS) -> dict[str, int]:
+    '''
+    Count all occurrences of the words in the grid in the given reading directions.
+
+    :param grid: character codes of the grid, see common.load_char_grid
+    :type grid: np.ndarray
+    :param words: words to search for
+    :type words: list[str]
+    :param directions: (row step, column step) of each reading direction, by default all eight directions
+    :return: number of occurrences per word
+    :rtype: dict[str, int]
+    '''
+    patterns = {word: [([(k * dr, k * dc, char) for k, char in enumerate(word)], None) for dr, dc in directions] for word in words}
+    return _count_pattern_groups(grid, patterns)
+
+
+def count_templates(grid: np.ndarray, templates: list[list[str]], rotate: bool = True, wildcard: str = '.') -> list[int]:
+    '''
+    Count all occurrences of the 2D templates in the grid.
+    A template only matches where its whole box fits into the grid, wildcard cells at its border included.
+
+    :param grid: character codes of the grid, see common.load_char_grid
+    :type grid: np.ndarray
+    :param templates: templates given as list of equally long rows, e.g. ["M.S", ".A.", "M.S"]
+    :type templates: list[list[str]]
+    :param rotate: if True, all four 90° rotations of each template are counted
+    :type rotate: bool
+    :param wildcard: character of template cells that match anything
+    :type wildcard: str
+    :return: number of occurrences per template
+    :rtype: list[int]
+    '''
+    patterns = {}
+    for idx, template in enumerate(templates):
+        cells = np.array([list(row) for row in template])
+        rotations = [np.rot90(cells, k) for k in range(4)] if rotate else [cells]
+        patterns[idx] = [([(r, c, rot[r, c]) for r, c in zip(*np.where(rot != wildcard))], rot.shape) for rot in rotations]
+    counts = _count_pattern_groups(grid, patterns)
+    return [counts[idx] for idx in range(len(templates))]
+
+
+def _count_pattern_groups(grid: np.ndarray, groups: dict) -> dict:
+    # Count every group of patterns, each pattern is given as (cells, extent) with extent None for words.
+    # Identical placements within a group (e.g. a palindrome read in both directions or a symmetric template rotated)
+    # are only counted once.
+    trie = {}
+    terminals = {}
+    for key, patterns in groups.items():
+        unique = {_normalize(cells, extent) for cells, extent in patterns}
+        for pattern, extent in unique:
+            node = trie
+            for cell in pattern:
+                node = node.setdefault(cell, {})
+            terminals.setdefault(id(node), []).append((key, extent))
+
+    # After normalization all offsets are non-negative. The grid is padded by the largest offset at the bottom and right,
+    # so every cell of a pattern starting inside the grid can be read from the flattened padded grid without bounds checks.
+    rows, cols = grid.shape
+    pad = max((max(r, c) for r, c, _ in _walk_cells(trie)), default=0)
+    width = cols + pad
+    padded = np.zeros((rows + pad, width), dtype=np.uint8)
+    padded[:rows, :cols] = grid
+    flat = padded.ravel()
+
+    # First trie level: group the positions of all cells by their character with a single stable sort over the grid.
+    # Every first cell (r, c, char) turns the positions of char into candidate starts shifted by (r, c).
+    counts = {key: 0 for key in groups}
+    stack = []
+    order = np.argsort(grid.ravel(), kind='stable')
+    char_bounds = np.concatenate([[0], np.cumsum(np.bincount(grid.ravel(), minlength=256))])
+    for char, children in _group_by(trie.items(), lambda cell: cell[2]).items():
+        positions = order[char_bounds[ord(char)]:char_bounds[ord(char) + 1]]
+        pos_r, pos_c = np.divmod(positions, cols)
+        for (r, c, _), child in children:
+            inside = (pos_r >= r) & (pos_c >= c)
+            stack.append((child, (pos_r[inside] - r) * width + (pos_c[inside] - c)))
+
+    # Depth-first walk through the trie. Each node holds the start positions (index into flat) that matched all cells so far.
+    # The cell values at an offset are gathered once for all children with that offset and split by character.
+    while stack:
+        node, candidates = stack.pop()
+        if len(candidates) == 0:
+            continue  # no match left for any pattern below this node
+        for key, (height, length) in terminals.get(id(node), []):
+            # Wildcard cells are not checked, their part of the extent is only required to lie inside the grid
+            start_r, start_c = np.divmod(candidates, width)
+            counts[key] += int(np.count_nonzero((start_r <= rows - height) & (start_c <= cols - length)))
+        for (r, c), children in _group_by(node.items(), lambda cell: cell[:2]).items():
+            values = flat[candidates + r * width + c]
+            if len(children) == 1:
+                (_, _, char), child = children[0]
+                stack.append((child, candidates[values == ord(char)]))
+                continue
+            value_order = np.argsort(values, kind='stable')
+            value_bounds = np.concatenate([[0], np.cumsum(np.bincount(values, minlength=256))])
+            for (_, _, char), child in children:
+                stack.append((child, candidates[value_order[value_bounds[ord(char)]:value_bounds[ord(char) + 1]]]))
+    return counts
+
+
+def _normalize(pattern: list[tuple], extent: tuple | None = None) -> tuple:
+    # Shift the pattern so that its smallest offsets are zero and sort the cells.
+    # Equal placements yield equal keys and patterns with common cells share trie paths.
+    # Patterns with a given extent (templates) are already relative to the top left corner of their box and are not shifted.
+    min_r = min(r for r, _, _ in pattern) if extent is None else 0
+    min_c = min(c for _, c, _ in pattern) if extent is None else 0
+    cells = tuple(sorted((int(r - min_r), int(c - min_c), str(char)) for r, c, char in pattern))
+    if extent is None:
+        extent = (max(r for r, _, _ in cells) + 1, max(c for _, c, _ in cells) + 1)
+    return cells, tuple(int(n) for n in extent)
+
+
+def _group_by(items, key) -> dict:
+    # Group (cell, child) items of a trie node by a key of the cell
+    grouped = {}
+    for cell, child in items:
+        grouped.setdefault(key(cell), []).append((cell, child))
+    return grouped
+
+
+def _walk_cells(trie: dict):
+    for cell, child in trie.items():
+        yield cell
+        yield from _walk_cells(child)
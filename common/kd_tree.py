@@ -0,0 +1,223 @@
+import numpy as np
+
+
+'''
+k-d tree over integer points for nearest neighbor queries.
+
+    The points are reordered, so that every node covers a contiguous range of them. A node is split at the median of its widest
+    dimension until at most leaf_size points remain. Queries are grouped by their leaf into blocks. All blocks traverse the tree
+    together, one level per step, dropping every node that is farther from a block than a bound on what the block still needs.
+    The distances from each block to its remaining leaves are computed at once.
+    Distances are squared euclidean distances in int64. Ties are broken by the smaller point index, for this purpose each
+    candidate is encoded as a single key distance * num_points + index.
+'''
+
+
+_NO_KEY = np.iinfo(np.int64).max
+
+
+class KDTree:
+    def __init__(self, points: np.ndarray, leaf_size: int = 64):
+        '''
+        Build the tree.
+
+        :param points: integer coordinates -> shape (num_points, num_dims)
+        :type points: np.ndarray
+        :param leaf_size: maximum number of points per leaf
+        :type leaf_size: int
+        '''
+        points = np.asarray(points, dtype=np.int64)
+        order = np.arange(len(points))
+        start, end, children = [0], [len(points)], [(-1, -1)]
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if end[node] - start[node] <= leaf_size:
+                continue
+            segment = order[start[node]:end[node]]
+            dim = np.argmax(np.ptp(points[segment], axis=0))
+            middle = len(segment) // 2
+            order[start[node]:end[node]] = segment[np.argpartition(points[segment, dim], middle)]
+            children[node] = (len(start), len(start) + 1)
+            start += [start[node], start[node] + middle]
+            end += [start[node] + middle, end[node]]
+            children += [(-1, -1), (-1, -1)]
+            stack += list(children[node])
+
+        self.leaf_size = leaf_size
+        self.index = order  # original index of every point in tree order
+        self.points = points[order]
+        self.start, self.end = np.array(start), np.array(end)
+        self.children = np.array(children)
+        self.lower = np.array([self.points[s:e].min(axis=0) for s, e in zip(start, end)]).reshape(len(start), -1)
+        self.upper = np.array([self.points[s:e].max(axis=0) for s, e in zip(start, end)]).reshape(len(start), -1)
+        self.leaves = np.flatnonzero(self.children[:, 0] < 0)
+        self.leaves = self.leaves[np.argsort(self.start[self.leaves])]
+
+    def _blocks(self, queries: np.ndarray | None) -> list[np.ndarray]:
+        # Positions (in tree order) of the query points, grouped by their leaf
+        positions = np.arange(len(self.index))
+        if queries is not None:
+            rank = np.empty_like(self.index)
+            rank[self.index] = positions
+            positions = np.sort(rank[queries])
+        leaf = np.searchsorted(self.start[self.leaves], positions, side='right')
+        return np.split(positions, np.flatnonzero(np.diff(leaf)) + 1) if len(positions) else []
+
+    def _candidate_leaves(self, blocks: list[np.ndarray], upper_bound) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Traverse the tree for all blocks of query points at once, one level per step.
+
+        :param blocks: positions (in tree order) of the query points per block
+        :type blocks: list[np.ndarray]
+        :param upper_bound: function (block, node, max_distances) -> distance per pair of block and node, up to which the node is kept.
+            The nodes of a block are disjoint, and max_distances bounds the distance of every query of the block to every point of the node.
+        :return: pairs of block and leaf, sorted by block
+        :rtype: tuple[np.ndarray, np.ndarray]
+        '''
+        lower = np.array([self.points[block].min(axis=0) for block in blocks])
+        upper = np.array([self.points[block].max(axis=0) for block in blocks])
+        block, node = np.arange(len(blocks)), np.zeros(len(blocks), dtype=np.int64)
+        while True:
+            # Smallest and largest distance between the bounding boxes of block and node
+            gaps = np.maximum(self.lower[node] - upper[block], 0) + np.maximum(lower[block] - self.upper[node], 0)
+            spans = np.maximum(self.upper[node] - lower[block], upper[block] - self.lower[node])
+            keep = np.sum(gaps * gaps, axis=1) <= upper_bound(block, node, np.sum(spans * spans, axis=1))
+            block, node = block[keep], node[keep]
+            inner = self.children[node, 0] >= 0
+            if not inner.any():
+                order = np.argsort(block, kind='stable')
+                return block[order], node[order]
+            block = np.concatenate((block[~inner], np.repeat(block[inner], 2)))
+            node = np.concatenate((node[~inner], self.children[node[inner]].ravel()))
+
+    def _leaf_points(self, leaves: np.ndarray) -> np.ndarray:
+        # Positions (in tree order) of all points of the given leaves
+        counts = self.end[leaves] - self.start[leaves]
+        return np.repeat(self.start[leaves] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    def _keys(self, positions: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        # Keys (distance * num_points + index) between all query and all target points -> shape (len(positions), len(targets))
+        distances = np.zeros((len(positions), len(targets)), dtype=np.int64)
+        for dim in range(self.points.shape[1]):
+            differences = self.points[positions, dim, None] - self.points[None, targets, dim]
+            distances += differences * differences
+        return distances * len(self.index) + self.index[targets]
+
+    def _closest_leaves(self, positions: np.ndarray, leaves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Distances of all query points to the bounding boxes of the leaves -> shape (len(positions), len(leaves)), closest leaves first
+        gaps = np.maximum(self.lower[None, leaves] - self.points[positions, None], 0) + np.maximum(self.points[positions, None] - self.upper[None, leaves], 0)
+        distances = np.sum(gaps * gaps, axis=2)
+        order = np.argsort(distances.min(axis=0), kind='stable')
+        return leaves[order], distances[:, order]
+
+    def knn(self, k: int, queries: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Find the k nearest other points of each query point.
+
+        :param k: number of neighbors, at most num_points - 1
+        :type k: int
+        :param queries: indices of the query points, all points if None
+        :type queries: np.ndarray | None
+        :return: query indices, neighbor indices sorted by (distance, index) and their squared distances -> shapes (q,), (q, k), (q, k)
+        :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+        '''
+        num_points = len(self.index)
+        blocks = self._blocks(queries)
+        sizes = self.end - self.start
+
+        def upper_bound(block, node, max_distances):
+            # k other points are certainly within the distance, at which the closest nodes hold k + 1 points (the query may be one of them)
+            order = np.lexsort((max_distances, block))
+            counts = np.cumsum(sizes[node[order]])
+            first = np.r_[0, np.flatnonzero(np.diff(block[order])) + 1]
+            counts -= np.repeat(counts[first] - sizes[node[order[first]]], np.diff(np.r_[first, len(order)]))
+            enough = counts >= k + 1
+            bounds = np.full(len(blocks), _NO_KEY, dtype=np.int64)
+            np.minimum.at(bounds, block[order[enough]], max_distances[order[enough]])
+            return bounds[block]
+
+        block, leaf = self._candidate_leaves(blocks, upper_bound)
+        all_keys = []
+        for positions, leaves in zip(blocks, np.split(leaf, np.searchsorted(block, np.arange(1, len(blocks))))):
+            # The closest leaves holding k + 1 points bound the k-th neighbor of every query.
+            # The other leaves are only checked if they are closer than this bound for at least one query.
+            leaves, box_distances = self._closest_leaves(positions, leaves)
+            first = np.searchsorted(np.cumsum(sizes[leaves]), k + 1) + 1
+            targets = self._leaf_points(leaves[:first])
+            keys = self._keys(positions, targets)
+            keys[positions[:, None] == targets[None, :]] = _NO_KEY
+            best = np.partition(keys, k - 1, axis=1)[:, :k]
+            rest = leaves[first:][np.any(box_distances[:, first:] <= best.max(axis=1, keepdims=True) // num_points, axis=0)]
+            if len(rest):
+                targets = self._leaf_points(rest)
+                keys = self._keys(positions, targets)
+                keys[positions[:, None] == targets[None, :]] = _NO_KEY
+                best = np.partition(np.concatenate((best, keys), axis=1), k - 1, axis=1)[:, :k]
+            all_keys.append(np.sort(best, axis=1))
+        if not blocks:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, k), dtype=np.int64), np.zeros((0, k), dtype=np.int64)
+        keys = np.concatenate(all_keys)
+        return self.index[np.concatenate(blocks)], keys % num_points, keys // num_points
+
+    def nearest_outside(self, labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Find the nearest point with a different label for every group of points with the same label (e.g. connected components).
+
+        Subtrees holding only the label of a block are skipped. Blocks of a single label share the bound of their whole group,
+        so blocks deep inside of a large group are dropped as soon as a closer pair is certain elsewhere.
+
+        :param labels: label of every point, non-negative integers below num_points
+        :type labels: np.ndarray
+        :return: per point the nearest point with another label and its squared distance. Only the nearest pair of every group is
+            guaranteed, other points may report -1 if they cannot improve on their group.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        '''
+        num_points = len(self.index)
+        tree_labels = labels[self.index]
+        # Label of every node if all of its points share it, -1 otherwise. Children are created after their parents.
+        node_labels = np.full(len(self.start), -1)
+        for node in reversed(range(len(self.start))):
+            near, far = self.children[node]
+            if near < 0:
+                segment = tree_labels[self.start[node]:self.end[node]]
+                node_labels[node] = segment[0] if np.all(segment == segment[0]) else -1
+            elif node_labels[near] == node_labels[far]:
+                node_labels[node] = node_labels[near]
+
+        blocks = self._blocks(None)
+        block_labels = node_labels[self.leaves]
+        uniform = block_labels >= 0
+
+        def upper_bound(block, node, max_distances):
+            # A node holding two labels or another label than the block has a point of another label for every query of the block
+            other = (node_labels[node] < 0) | (node_labels[node] != block_labels[block])
+            bounds = np.full(len(blocks), _NO_KEY, dtype=np.int64)
+            np.minimum.at(bounds, block[other], max_distances[other])
+            group_bounds = np.full(num_points, _NO_KEY, dtype=np.int64)
+            np.minimum.at(group_bounds, block_labels[uniform], bounds[uniform])
+            bounds[uniform] = group_bounds[block_labels[uniform]]
+            return np.where(other, bounds[block], -1)
+
+        block, leaf = self._candidate_leaves(blocks, upper_bound)
+        nearest = np.full(num_points, _NO_KEY, dtype=np.int64)
+        group_best = np.full(num_points, _NO_KEY, dtype=np.int64)  # distance of the closest pair found per label
+        for positions, leaves in zip(blocks, np.split(leaf, np.searchsorted(block, np.arange(1, len(blocks))))):
+            # The closest leaf bounds the queries, the other leaves are only checked if they can improve a query or its group
+            leaves, box_distances = self._closest_leaves(positions, leaves)
+            own = tree_labels[positions]
+            best = np.full(len(positions), _NO_KEY, dtype=np.int64)
+            for part in (slice(0, 1), slice(1, None)):
+                bounds = np.minimum(best // num_points, group_best[own])
+                checked = leaves[part][np.any(box_distances[:, part] <= bounds[:, None], axis=0)]
+                if len(checked):
+                    targets = self._leaf_points(checked)
+                    keys = self._keys(positions, targets)
+                    keys[own[:, None] == tree_labels[None, targets]] = _NO_KEY
+                    best = np.minimum(best, keys.min(axis=1))
+            found = best < _NO_KEY
+            np.minimum.at(group_best, own[found], best[found] // num_points)
+            nearest[self.index[positions]] = best
+
+        found = nearest < _NO_KEY
+        return np.where(found, nearest % num_points, -1), np.where(found, nearest // num_points, -1)
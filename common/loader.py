@@ -0,0 +1,141 @@
+import mmap
+
+import numpy as np
+
+
+'''
+Shared input loader for puzzle files that consist of separated integers.
+
+    The file is memory-mapped and viewed as a uint8 array without copying it.
+    All digit runs are located with array operations and converted digit position by digit position,
+    so no Python strings or lists are created for the individual numbers.
+    Any non-digit character (space, comma, newline, ...) acts as separator.
+'''
+
+
+def parse_ints(buffer, signed: bool = False, dtype=np.int64) -> np.ndarray:
+    '''
+    Parse all integers contained in a buffer into a flat array.
+
+    :param buffer: bytes-like object (bytes, mmap, ...) or string to parse
+    :param signed: if True, a '-' directly in front of a number makes it negative. Otherwise it is treated as separator (e.g. ranges "11-22")
+    :type signed: bool
+    :param dtype: dtype of the returned array
+    :return: all integers in order of appearance
+    :rtype: ndarray[(-1,), dtype]
+    '''
+    if isinstance(buffer, str):
+        buffer = buffer.encode()
+    values, _ = _parse_digit_runs(np.frombuffer(buffer, dtype=np.uint8), signed, dtype)
+    return values
+
+
+def _parse_digit_runs(chars: np.ndarray, signed: bool, dtype) -> tuple[np.ndarray, np.ndarray]:
+    # Returns the values of all numbers and the index of their first digit within chars.
+    digits = chars - ord('0')  # non-digits wrap around to values >= 10
+    is_digit = digits < 10
+
+    # Every number is a run of digits. Starts and (exclusive) ends are the rising and falling edges of the digit mask.
+    edges = np.diff(is_digit.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+
+    # Horner scheme over the digit positions. The loop runs once per digit of the longest number, not once per number.
+    values = np.zeros(len(starts), dtype=dtype)
+    for k in range(int(lengths.max(initial=0))):
+        active = lengths > k
+        values[active] = values[active] * 10 + digits[starts[active] + k]
+
+    if signed:
+        negative = np.zeros(len(starts), dtype=bool)
+        negative[starts > 0] = chars[starts[starts > 0] - 1] == ord('-')
+        values[negative] *= -1
+    return values, starts
+
+
+def load_int_columns(filename: str, signed: bool = False, dtype=np.int64) -> np.ndarray:
+    '''
+    Load a file of integer columns, e.g. "3   4" or "162,817,812" per line, into a 2D array.
+
+    :param filename: name of the input file
+    :type filename: str
+    :param signed: if True, negative numbers are parsed (see parse_ints)
+    :type signed: bool
+    :param dtype: dtype of the returned array
+    :return: one row per line, one column per number in the line
+    :rtype: ndarray[(num_lines, num_columns), dtype]
+    '''
+    with open(filename, 'rb') as file:
+        # Empty files cannot be memory-mapped
+        if file.seek(0, 2) == 0:
+            return np.zeros((0, 0), dtype=dtype)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            first_line = buffer[:buffer.find(b'\n')] if buffer.find(b'\n') >= 0 else buffer[:]
+            num_columns = len(parse_ints(first_line, signed, dtype))
+            data, _ = _parse_digit_runs(np.frombuffer(buffer, dtype=np.uint8), signed, dtype)
+    return data.reshape(-1, num_columns)
+
+
+def load_int_rows(filename: str, signed: bool = False, dtype=np.int64, fill: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Load a file with a varying number of integers per line into a padded 2D array.
+
+    :param filename: name of the input file
+    :type filename: str
+    :param signed: if True, negative numbers are parsed (see parse_ints)
+    :type signed: bool
+    :param dtype: dtype of the returned array
+    :param fill: value of the padding entries
+    :type fill: int
+    :return: padded rows (one per line) and the number of valid entries per row
+    :rtype: tuple[ndarray[(num_lines, max_length), dtype], ndarray[(num_lines,), int]]
+    '''
+    with open(filename, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return np.zeros((0, 0), dtype=dtype), np.zeros(0, dtype=int)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse_int_rows(buffer, signed, dtype, fill)
+
+
+def parse_int_rows(buffer, signed: bool = False, dtype=np.int64, fill: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Parse a buffer with a varying number of integers per line into a padded 2D array, see load_int_rows.
+
+    :param buffer: bytes-like object (bytes, mmap, ...) or string to parse
+    :return: padded rows (one per line) and the number of valid entries per row
+    :rtype: tuple[ndarray[(num_lines, max_length), dtype], ndarray[(num_lines,), int]]
+    '''
+    if isinstance(buffer, str):
+        buffer = buffer.encode()
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    if len(chars) == 0:
+        return np.zeros((0, 0), dtype=dtype), np.zeros(0, dtype=int)
+    values, starts = _parse_digit_runs(chars, signed, dtype)
+    newlines = np.flatnonzero(chars == ord('\n'))
+    num_lines = len(newlines) + (chars[-1] != ord('\n'))
+    del chars  # release the view, memory maps cannot be closed while it exists
+
+    # Assign every number to its line and to its position within the line
+    line_idcs = np.searchsorted(newlines, starts)
+    lengths = np.bincount(line_idcs, minlength=num_lines)
+    line_starts = np.cumsum(lengths) - lengths
+    col_idcs = np.arange(len(values)) - line_starts[line_idcs]
+
+    rows = np.full((num_lines, lengths.max(initial=0)), fill, dtype=dtype)
+    rows[line_idcs, col_idcs] = values
+    return rows, lengths
+
+
+def load_char_grid(filename: str) -> np.ndarray:
+    '''
+    Load a rectangular character grid (one row per line) as array of byte values, e.g. grid == ord('#').
+
+    :param filename: name of the input file
+    :type filename: str
+    :return: character codes of the grid
+    :rtype: ndarray[(num_rows, num_cols), uint8]
+    '''
+    with open(filename, 'rb') as file:
+        data = file.read().replace(b'\r', b'').rstrip(b'\n') + b'\n'
+    width = data.find(b'\n')
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, width + 1)[:, :width].copy()